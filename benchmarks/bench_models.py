@@ -0,0 +1,81 @@
+"""Compares decoding a large canvas into dicts with decoding it into typed models.
+
+Usage: python benchmarks/bench_models.py [nodes]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ocp import models  # noqa: E402
+from ocp.models import Canvas  # noqa: E402
+
+
+def make_canvas(nodes: int) -> bytes:
+    prompt = {"locales": {"en-US": {"omIVR": {"normal": "Please say your account number."}}}}
+    return json.dumps(
+        {
+            "id": "canvas",
+            "name": "Benchmark",
+            "nodes": [
+                {
+                    "id": f"n{i}",
+                    "type": "miniapp",
+                    "position": {"x": i * 10.5, "y": i * 3.25},
+                    "data": {
+                        "label": f"State {i}",
+                        "prompts": [prompt] * 4,
+                        "settings": {f"key{k}": k for k in range(20)},
+                    },
+                }
+                for i in range(nodes)
+            ],
+            "edges": [
+                {"id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}", "sourceHandle": "success"}
+                for i in range(nodes - 1)
+            ],
+        }
+    ).encode()
+
+
+def measure(decode, content: bytes, repeat: int = 10):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(content)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = decode(content)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content = make_canvas(nodes)
+    print(f"{nodes} nodes, {len(content) / 2**20:.1f} MiB of JSON")
+
+    fast = models.orjson
+    cases = [("json.loads -> dict", json.loads)]
+    if fast is not None:
+        cases.append(("orjson.loads -> dict", fast.loads))
+        cases.append(("Canvas.from_bytes (orjson)", Canvas.from_bytes))
+    models.orjson = None
+    cases.append(("Canvas.from_bytes (json)", Canvas.from_bytes))
+
+    for name, decode in cases:
+        models.orjson = fast if "orjson" in name else None
+        seconds, retained = measure(decode, content)
+        print(f"{name:30} {seconds * 1000:8.1f} ms {retained / 2**20:8.1f} MiB retained")
+    models.orjson = fast
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Compares the HTTP/1.1 and HTTP/2 transports under concurrent requests to one host.
+
+Starts a local HTTPS server (hypercorn) answering every request after a fixed
+delay, then sends the same burst of concurrent requests through each transport.
+
+Usage: python benchmarks/bench_transport.py [requests] [concurrency] [delay_ms]
+Needs: pip install hypercorn httpx[http2] cryptography
+"""
+
+import datetime
+import ipaddress
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import httpx  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+from ocp import transport  # noqa: E402
+
+PORT = 8443
+URL = f"https://127.0.0.1:{PORT}/miniapps/api/apps"
+
+SERVER = """
+import asyncio, os
+
+DELAY = float(os.environ["DELAY_MS"]) / 1000
+BODY = b'{"items": [' + b",".join(b'{"id": "%d", "name": "App %d"}' % (i, i) for i in range(50)) + b"]}"
+
+
+async def app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await asyncio.sleep(DELAY)
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": BODY})
+"""
+
+
+def make_certificate(directory: str) -> tuple[str, str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+def wait_for_server(cert_path: str):
+    for _ in range(100):
+        try:
+            httpx.get(URL, verify=ssl.create_default_context(cafile=cert_path))
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError("The server did not start")
+
+
+def run(total: int, concurrency: int, **kwargs) -> tuple[float, set]:
+    versions = set()
+
+    def call(_):
+        response = transport.get(URL, **kwargs)
+        response.raise_for_status()
+        versions.add(getattr(response, "http_version", "HTTP/1.1"))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(total)))
+    return time.perf_counter() - start, versions
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    delay_ms = sys.argv[3] if len(sys.argv) > 3 else "20"
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = make_certificate(directory)
+        with open(os.path.join(directory, "server.py"), "w") as f:
+            f.write(SERVER)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "hypercorn", "server:app", "--bind", f"127.0.0.1:{PORT}",
+             "--certfile", cert_path, "--keyfile", key_path],
+            cwd=directory,
+            env={**os.environ, "DELAY_MS": delay_ms},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(cert_path)
+            print(f"{total} requests, {concurrency} at a time, {delay_ms} ms server delay")
+
+            transport._client = False
+            seconds, versions = run(total, concurrency, verify=cert_path)
+            print(f"requests (HTTP/1.1)   {seconds:6.2f} s {total / seconds:8.0f} req/s  {sorted(versions)}")
+
+            for connections in (1, 4):
+                transport._client = httpx.Client(
+                    http2=True,
+                    timeout=None,
+                    verify=ssl.create_default_context(cafile=cert_path),
+                    limits=httpx.Limits(max_connections=connections),
+                )
+                seconds, versions = run(total, concurrency)
+                print(
+                    f"httpx (HTTP/2, {connections} conn) {seconds:6.2f} s {total / seconds:8.0f} req/s  "
+                    f"{sorted(versions)}"
+                )
+                transport._client.close()
+        finally:
+            transport._client = None
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
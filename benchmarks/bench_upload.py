@@ -0,0 +1,69 @@
+"""Compares building the update_miniapp upload body in one piece with streaming it.
+
+Measures the peak memory and time taken to produce the whole request body, as a
+transport sending it would. The model is a synthetic miniapp model.
+
+Usage: python benchmarks/bench_upload.py [states]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ocp.multipart import json_file_upload  # noqa: E402
+
+
+def make_model(states: int) -> dict:
+    prompt = {"locales": {"en-US": {"omIVR": {"normal": "Please say or enter your account number."}}}}
+    return {
+        "states": [
+            {"id": f"state-{i}", "prompts": [prompt] * 3, "settings": {f"key{k}": k for k in range(30)}}
+            for i in range(states)
+        ]
+    }
+
+
+def current(model) -> int:
+    files = {"file": ("app.json", json.dumps(model), "application/json")}
+    prepared = requests.Request("PUT", "http://localhost/", files=files).prepare()
+    return len(prepared.body)
+
+
+def streamed(model, compress=False) -> int:
+    _, body = json_file_upload("file", "app.json", model, compress=compress)
+    return sum(len(chunk) for chunk in body)
+
+
+def measure(build, model):
+    start = time.perf_counter()
+    build(model)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    size = build(model)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, size
+
+
+def main():
+    states = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    model = make_model(states)
+    print(f"{states} states")
+    for name, build in (
+        ("json.dumps + requests files", current),
+        ("streamed", streamed),
+        ("streamed + gzip", lambda m: streamed(m, compress=True)),
+    ):
+        seconds, peak, size = measure(build, model)
+        print(f"{name:28} {seconds * 1000:8.0f} ms {peak / 2**20:8.1f} MiB peak {size / 2**20:8.1f} MiB sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,100 @@
+import asyncio
+import inspect
+import json
+import threading
 from datetime import datetime, timedelta
 
-from mcp.server.fastmcp import FastMCP
+import anyio
+from mcp.server.fastmcp import Context, FastMCP
+from pydantic import AnyUrl
 
-from ocp.insights import InsightsClient
+from ocp.insights import InsightsClient, dialog_id
+from ocp.dialog_query import plan_query
+from ocp.latency import profile_logs
+from ocp.clustering import cluster_paths, path_signature
+from ocp.batch import run_batch
 from ocp.miniapps import MiniAppsClient
 from ocp.orchestrator import OrchestratorClient
+from ocp.canvas_diff import diff_canvases
+from ocp.watcher import get_watcher
+from ocp import profiling
+from ocp.profiling import profiled
+from ocp.prefetch import (
+    get_prefetcher,
+    prefetch_canvas_references,
+    prefetch_dialog_logs,
+)
 from ocp.integrations import IntegrationsClient
 from ocp.environments_manager import EnvironmentsManagerClient
+from ocp.variables_sync import diff_collections, export_collections, sync_collections
+from ocp.environments import (
+    fan_out,
+    get_client,
+    get_environment,
+    get_environments,
+    merge_tagged,
+)
 
 
 mcp = FastMCP("OCP")
+profiling.configure_from_env()
 
 
 @mcp.tool()
-def search_miniapps(search_term: str | None = None) -> list[str]:
+@profiled
+def list_environments() -> list[dict]:
+    """List the OCP environments (regions and tenants) that tools can be run against."""
+    return [
+        {"name": env.name, "host": env.host, "analytics_host": env.get_analytics_host()}
+        for env in get_environments().values()
+    ]
+
+
+@mcp.tool()
+@profiled
+def search_miniapps(
+    search_term: str | None = None, environments: list[str] | None = None
+) -> list[str]:
     """Search miniapps. Useful to return a list of miniapps that match a search term.
     Args:
         search_term: Optional search term to filter miniapps
+        environments: Optional list of environment names to search across, as returned by list_environments. Each environment's result is tagged with its name.
     """
-    client = MiniAppsClient()
+    if environments:
+        return merge_tagged(
+            fan_out(
+                lambda env: get_client(MiniAppsClient, env).get_apps(search_term=search_term),
+                environments,
+            )
+        )
+
+    client = get_client(MiniAppsClient)
     apps = client.get_apps(search_term=search_term)
     return apps
 
 
 @mcp.tool()
-def get_miniapp(miniapp_id: str) -> dict:
+@profiled
+def get_miniapp(miniapp_id: str, environment: str | None = None) -> dict:
     """Get a specific miniapp by its ID. Useful to return various information about a miniapp.
 
     Args:
         miniapp_id: The ID of the miniapp to retrieve
+        environment: Optional name of the environment the miniapp lives in, as tagged in search results. Defaults to the default environment.
 
     Returns:
         The miniapp data as a dictionary
     """
-    client = MiniAppsClient()
+    _claim("miniapp", environment, miniapp_id)
+    client = get_client(MiniAppsClient, environment)
     return client.get_miniapp(miniapp_id)
 
 
 @mcp.tool()
-def set_miniapp_prompt(miniapp_id: str, prompt_type: str, prompt: str) -> dict:
+@profiled
+def set_miniapp_prompt(
+    miniapp_id: str, prompt_type: str, prompt: str, environment: str | None = None
+) -> dict:
     """Set various types of prompts for a specific miniapp. Unified interface for setting welcome, initial, error and reaction prompts.
 
     Args:
@@ -59,17 +115,20 @@ def set_miniapp_prompt(miniapp_id: str, prompt_type: str, prompt: str) -> dict:
             - "reaction_same_state" - When user repeats same input
             - "reaction_nice_response" - Acknowledgement responses
         prompt: The prompt text to set
+        environment: Optional name of the environment the miniapp lives in. Defaults to the default environment.
     """
-    client = MiniAppsClient()
-    miniapp_json = client.get_miniapp(miniapp_id)
+    client = get_client(MiniAppsClient, environment)
+    # Read and write the same version, even if the active one changes in between
+    version = client.get_active_version()
+    miniapp_json = client.get_miniapp(miniapp_id, version=version)
 
     # Handle welcome/initial prompts
     if prompt_type == "welcome":
         miniapp_json["model"]["welcome"]["locales"]["en-US"]["omIVR"]["normal"] = prompt
-        return client.update_miniapp(miniapp_id, miniapp_json)
+        return client.update_miniapp(miniapp_id, miniapp_json, version=version)
     elif prompt_type == "initial":
         miniapp_json["model"]["ask"]["locales"]["en-US"]["omIVR"]["normal"] = prompt
-        return client.update_miniapp(miniapp_id, miniapp_json)
+        return client.update_miniapp(miniapp_id, miniapp_json, version=version)
 
     # Handle error prompts
     error_type_map = {
@@ -88,7 +147,7 @@ def set_miniapp_prompt(miniapp_id: str, prompt_type: str, prompt: str) -> dict:
         miniapp_json["model"]["errors"]["targetAction"][error_path]["locales"]["en-US"][
             "omIVR"
         ]["normal"] = prompt
-        return client.update_miniapp(miniapp_id, miniapp_json)
+        return client.update_miniapp(miniapp_id, miniapp_json, version=version)
 
     # Handle reaction prompts
     reaction_type_map = {
@@ -103,7 +162,7 @@ def set_miniapp_prompt(miniapp_id: str, prompt_type: str, prompt: str) -> dict:
         miniapp_json["model"]["reactions"][reaction_path]["locales"]["en-US"]["omIVR"][
             "normal"
         ] = prompt
-        return client.update_miniapp(miniapp_id, miniapp_json)
+        return client.update_miniapp(miniapp_id, miniapp_json, version=version)
 
     valid_types = (
         ["welcome", "initial"]
@@ -114,45 +173,105 @@ def set_miniapp_prompt(miniapp_id: str, prompt_type: str, prompt: str) -> dict:
 
 
 @mcp.tool()
-def get_dialog_logs(dialog_id: str) -> str:
+@profiled
+def get_dialog_logs(dialog_id: str, environment: str | None = None) -> str:
     """Get the dialog logs for a specific dialog ID. Useful for retrieving conversation history and analytics.
 
     Args:
         dialog_id: The ID of the dialog to retrieve logs for
+        environment: Optional name of the environment the dialog took place in, as tagged in search results. Defaults to the default environment.
 
     Returns:
         The dialog log data as a dictionary
     """
-    client = InsightsClient()
+    _claim("dialog_log", environment, dialog_id)
+    client = get_client(InsightsClient, environment)
     return client.get_dialog_log(dialog_id)
 
 
 @mcp.tool()
-def search_orchestrator_apps(search_term: str | None = None) -> list[str]:
+@profiled
+def search_orchestrator_apps(
+    search_term: str | None = None, environments: list[str] | None = None
+) -> list[str]:
     """Search Orchestrator apps with optional search term.
 
     Args:
         search_term: Optional search term to filter apps
+        environments: Optional list of environment names to search across, as returned by list_environments. Each environment's result is tagged with its name.
     """
-    client = OrchestratorClient()
+    if environments:
+        return merge_tagged(
+            fan_out(
+                lambda env: get_client(OrchestratorClient, env).search_apps(
+                    search_term=search_term
+                ),
+                environments,
+            )
+        )
+
+    client = get_client(OrchestratorClient)
     return client.search_apps(search_term=search_term)
 
 
 @mcp.tool()
-def get_orchestrator_app(canvas_id: str) -> dict:
+@profiled
+def get_orchestrator_app(canvas_id: str, environment: str | None = None) -> dict:
     """Get an Orchestrator application canvas by ID.
     Users can ask for this by saying "show me the app", "show me the canvas", "app contents" or "show me the flow".
     The resulting JSON is a graph structure of nodes and edges athat describes a dialog flow.
 
     Args:
         canvas_id: The ID of the canvas to get. This is the ID of the application canvas, contained in the search_orchestrator_apps results.
+        environment: Optional name of the environment the app lives in, as tagged in search results. Defaults to the default environment.
     """
-    client = OrchestratorClient()
-    return client.get_canvas(canvas_id)
+    client = get_client(OrchestratorClient, environment)
+    canvas = client.get_canvas(canvas_id)
+
+    # The miniapps and variable collections of a canvas are usually opened next
+    prefetcher = get_prefetcher()
+    if prefetcher is not None:
+        prefetch_canvas_references(
+            prefetcher,
+            canvas,
+            get_environment(environment).name,
+            get_client(MiniAppsClient, environment),
+            get_client(EnvironmentsManagerClient, environment),
+        )
+    return canvas
 
 
 @mcp.tool()
-def search_dialog_logs(
+@profiled
+def diff_orchestrator_apps(
+    base_canvas_id: str,
+    target_canvas_id: str,
+    base_environment: str | None = None,
+    target_environment: str | None = None,
+) -> dict:
+    """Compare two Orchestrator application canvases and return what changed, instead of both full graphs.
+    Users can ask for this by saying "what changed in the flow", "compare these apps" or "diff the canvases".
+    Works for two revisions of one app, two different apps, or the same app in two environments.
+
+    Args:
+        base_canvas_id: The ID of the canvas to compare from, as in the search_orchestrator_apps results.
+        target_canvas_id: The ID of the canvas to compare to.
+        base_environment: Optional name of the environment the base canvas lives in. Defaults to the default environment.
+        target_environment: Optional name of the environment the target canvas lives in. Defaults to the default environment.
+
+    Returns:
+        The added, removed, modified (with the changed fields) and moved nodes, and the added, removed and rewired edges
+    """
+    base = get_client(OrchestratorClient, base_environment).get_canvas_model(base_canvas_id)
+    target = get_client(OrchestratorClient, target_environment).get_canvas_model(
+        target_canvas_id
+    )
+    return diff_canvases(base, target)
+
+
+@mcp.tool()
+@profiled
+async def search_dialog_logs(
     apps: list,
     from_date: str = None,
     to_date: str = None,
@@ -163,9 +282,12 @@ def search_dialog_logs(
     region: str = None,
     application_layer: bool = True,
     steps_gt: int = None,
+    environments: list[str] | None = None,
+    ctx: Context = None,
 ):
     """Search dialogs using various filter criteria. Can also be requested by users by saying
     "find sessions", "search logs" or "identify dialog logs"
+    Large searches are run in time slices, newest first. Progress is notified and the dialogs of each slice are sent as a log message as soon as they arrive.
 
     Args:
         apps (list): List of miniApp_ids or sandbox_flowapp_app_ids to filter by. This is not the same as the orchestrator app ID! One MUST get the sandbox_flowapp_app_id from the search_orchestrator_apps tool first.
@@ -178,59 +300,523 @@ def search_dialog_logs(
         region (str, optional): Region to filter by
         application_layer (bool, optional): Whether to include application layer. Defaults to True
         steps_gt (int, optional): Filter dialogs with steps greater than this number
+        environments (list, optional): List of environment names to search across, as returned by list_environments. Each dialog is tagged with its environment.
 
     Returns:
         dict: Search results containing matching dialogs
     """
-    # Default to last 24 hours if dates not provided
+    from_date, to_date = _default_window(from_date, to_date)
+    filters = {
+        "ani": ani,
+        "dialog_group": dialog_group,
+        "ocp_group_names": ocp_group_names,
+        "region": region,
+        "application_layer": application_layer,
+        "steps_gt": steps_gt,
+    }
+    targets = list(dict.fromkeys(environments)) if environments else [None]
+    for environment in targets:
+        get_environment(environment)
+    total = size * len(targets)
+    found = 0
+    cancelled = threading.Event()
+
+    async def search(environment):
+        nonlocal found
+        client = get_client(InsightsClient, environment)
+        slices = client.iter_dialog_slices(
+            apps, from_date, to_date, size, cancelled=cancelled, **filters
+        )
+        dialogs = []
+        while (chunk := await _next_in_thread(slices)) is not _DONE:
+            dialogs.extend(chunk)
+            found += len(chunk)
+            await _report_progress(ctx, found, total, "Searching dialogs")
+            await _send_partial(ctx, chunk, environment)
+
+        # The logs of the first dialogs found are usually read next
+        prefetcher = get_prefetcher()
+        if prefetcher is not None:
+            prefetch_dialog_logs(
+                prefetcher, dialogs, get_environment(environment).name, client, _PREFETCH_LOGS
+            )
+        return dialogs
+
+    # Stops the upstream requests when the client cancels the call
+    try:
+        if not environments:
+            return await search(None)
+
+        results = dict.fromkeys(targets)
+
+        async def collect(environment):
+            try:
+                results[environment] = await search(environment)
+            except Exception as e:
+                results[environment] = e
+
+        async with anyio.create_task_group() as tg:
+            for environment in targets:
+                tg.start_soon(collect, environment)
+        return merge_tagged(results)
+    finally:
+        cancelled.set()
+
+
+@mcp.tool()
+@profiled
+async def query_dialogs(
+    apps: list,
+    query: str,
+    from_date: str = None,
+    to_date: str = None,
+    size: int = 10,
+    max_scanned: int = 1000,
+    environment: str | None = None,
+    ctx: Context = None,
+) -> dict:
+    """Find dialogs matching a query on any of their fields, e.g. the long calls that ended in a transfer during office hours.
+    The query combines comparisons with and, or, not and parentheses. Comparisons are `field = value` (also != > >= < <=), `field in (a, b)`, `field between a and b`, `field contains "text"` and `field exists`. Strings are quoted and compared case-insensitively.
+    Fields: id, app, ani, region, dialog_group, ocp_group_name, duration (ms), steps, outcome, intent, start, hour and weekday (UTC, 1 is Monday), date, or any key of the search results (dots reach nested keys).
+    Example: `duration > 60000 and outcome = "transfer" and hour between 9 and 17 and steps >= 5`
+    Filters the search API supports are applied by it; the rest is applied to the dialogs it returns, searching through at most max_scanned dialogs. Matches are sent as a log message as soon as they are found.
+
+    Args:
+        apps (list): List of miniApp_ids or sandbox_flowapp_app_ids to filter by. One MUST get the sandbox_flowapp_app_id from the search_orchestrator_apps tool first.
+        query (str): The query dialogs must match
+        from_date (str, optional): Start date/time in ISO format or milliseconds timestamp. Defaults to 24 hours ago.
+        to_date (str, optional): End date/time in ISO format or milliseconds timestamp. Defaults to now.
+        size (int, optional): Number of matching dialogs to return. Defaults to 10
+        max_scanned (int, optional): Most dialogs to search through. Defaults to 1000
+        environment (str, optional): Environment name as returned by list_environments. Defaults to the default environment.
+
+    Returns:
+        dict: The matching dialogs, the number of dialogs searched and how the query was run
+    """
+    from_date, to_date = _default_window(from_date, to_date)
+    plan = plan_query(query)
+    client = get_client(InsightsClient, environment)
+    cancelled = threading.Event()
+    dialogs, scanned = [], 0
+    try:
+        chunks = client.query_dialogs(
+            apps, query, from_date, to_date, size, max_scanned, cancelled=cancelled
+        )
+        while (chunk := await _next_in_thread(chunks)) is not _DONE:
+            matches, scanned = chunk
+            dialogs.extend(matches)
+            await _report_progress(ctx, scanned, max_scanned, "Searching dialogs")
+            await _send_partial(ctx, matches)
+    finally:
+        cancelled.set()
+    return {
+        "dialogs": dialogs,
+        "scanned": scanned,
+        "pushed_down": plan.filters,
+        "filtered": str(plan.residual) if plan.residual is not None else None,
+    }
+
+
+# Number of dialog logs prefetched after a search
+_PREFETCH_LOGS = 5
+
+
+def _claim(kind: str, environment: str | None, resource_id: str):
+    """Tells the prefetcher, if any, that a tool was asked for a resource."""
+    prefetcher = get_prefetcher()
+    if prefetcher is not None:
+        prefetcher.claim((kind, get_environment(environment).name, resource_id))
+
+
+def _default_window(from_date: str | None, to_date: str | None) -> tuple[str, str]:
+    """Defaults a dialog search window to the last 24 hours."""
     if to_date is None:
         to_date = (datetime.utcnow() + timedelta(hours=2)).isoformat() + "Z"
     if from_date is None:
         from_date = (datetime.utcnow() - timedelta(days=1)).isoformat() + "Z"
+    return from_date, to_date
 
-    client = InsightsClient()
-    return client.search_dialogs(
-        apps=apps,
-        from_date=from_date,
-        to_date=to_date,
-        size=size,
-        ani=ani,
-        dialog_group=dialog_group,
-        ocp_group_names=ocp_group_names,
-        region=region,
-        application_layer=application_layer,
-        steps_gt=steps_gt,
-    )
+
+_DONE = object()
+
+
+async def _next_in_thread(iterator):
+    """Advances a blocking iterator in a worker thread, so that the event loop keeps
+    serving notifications and cancellations meanwhile. Returns `_DONE` once it is
+    exhausted. A cancelled call does not wait for the worker thread to finish."""
+    return await anyio.to_thread.run_sync(next, iterator, _DONE, abandon_on_cancel=True)
+
+
+async def _report_progress(ctx: Context | None, progress: float, total: float, message: str):
+    if ctx is not None:
+        await ctx.report_progress(progress, total, message)
+
+
+async def _send_partial(ctx: Context | None, items: list, environment: str | None = None):
+    """Sends the results that just arrived to the client ahead of the final result."""
+    if ctx is not None and items:
+        partial = [{**i, "environment": environment} for i in items] if environment else items
+        await ctx.log("info", json.dumps(partial), logger_name="partial_results")
+
+
+async def _search_dialog_log_texts(
+    apps: list,
+    from_date: str | None,
+    to_date: str | None,
+    size: int,
+    ctx: Context | None = None,
+) -> dict:
+    """Searches dialogs and fetches the raw log of each, keyed by dialog ID."""
+    from_date, to_date = _default_window(from_date, to_date)
+
+    client = get_client(InsightsClient)
+    cancelled = threading.Event()
+    try:
+        dialog_ids = []
+        slices = client.iter_dialog_slices(
+            apps, from_date, to_date, size, cancelled=cancelled
+        )
+        while (chunk := await _next_in_thread(slices)) is not _DONE:
+            dialog_ids.extend(dialog_id(d) for d in chunk if dialog_id(d))
+            await _report_progress(ctx, len(dialog_ids), 2 * size, "Searching dialogs")
+
+        logs = {}
+        fetched = client.iter_dialog_logs(dialog_ids, cancelled=cancelled)
+        while (item := await _next_in_thread(fetched)) is not _DONE:
+            logs[item[0]] = item[1]
+            await _report_progress(
+                ctx, len(dialog_ids) + len(logs), 2 * len(dialog_ids), "Fetching dialog logs"
+            )
+        return {i: logs[i] for i in dialog_ids if i in logs}
+    finally:
+        cancelled.set()
+
+
+@mcp.tool()
+@profiled
+async def get_slowest_states(
+    apps: list,
+    from_date: str = None,
+    to_date: str = None,
+    size: int = 100,
+    top: int = 10,
+    ctx: Context = None,
+) -> dict:
+    """Find the dialog states and integrations that make calls slow. Can also be requested by users by saying
+    "why are calls slow", "latency report" or "slowest states"
+
+    Args:
+        apps (list): List of miniApp_ids or sandbox_flowapp_app_ids to filter by. This is not the same as the orchestrator app ID! One MUST get the sandbox_flowapp_app_id from the search_orchestrator_apps tool first.
+        from_date (str, optional): Start date/time in ISO format or milliseconds timestamp. Defaults to 24 hours ago.
+        to_date (str, optional): End date/time in ISO format or milliseconds timestamp. Defaults to now.
+        size (int, optional): Number of dialogs to sample. Defaults to 100
+        top (int, optional): Number of states and integrations to report. Defaults to 10
+
+    Returns:
+        dict: The slowest states and integrations with their p50/p95/p99 latencies in milliseconds
+    """
+    logs = await _search_dialog_log_texts(apps, from_date, to_date, size, ctx)
+
+    profile = profile_logs(list(logs.values()))
+    return {
+        "dialogs": profile.dialogs,
+        "states": profile.slowest_states(top),
+        "integrations": profile.slowest_integrations(top),
+    }
+
+
+@mcp.tool()
+@profiled
+async def cluster_dialog_paths(
+    apps: list,
+    from_date: str = None,
+    to_date: str = None,
+    size: int = 500,
+    top: int = 10,
+    similarity: float = 0.8,
+    ctx: Context = None,
+) -> list[dict]:
+    """Group dialogs by the path of states they went through and return the most common paths.
+    Can also be requested by users by saying "top conversation paths", "common flows" or "how do calls go"
+
+    Args:
+        apps (list): List of miniApp_ids or sandbox_flowapp_app_ids to filter by. This is not the same as the orchestrator app ID! One MUST get the sandbox_flowapp_app_id from the search_orchestrator_apps tool first.
+        from_date (str, optional): Start date/time in ISO format or milliseconds timestamp. Defaults to 24 hours ago.
+        to_date (str, optional): End date/time in ISO format or milliseconds timestamp. Defaults to now.
+        size (int, optional): Number of dialogs to cluster. Defaults to 500
+        top (int, optional): Number of clusters to return. Defaults to 10
+        similarity (float, optional): Minimum similarity (0-1) of paths grouped together. Use 1.0 for identical paths only. Defaults to 0.8
+
+    Returns:
+        list[dict]: The largest clusters with their size, path and one representative dialog ID
+    """
+    logs = await _search_dialog_log_texts(apps, from_date, to_date, size, ctx)
+
+    paths = {i: path_signature(log) for i, log in logs.items()}
+    # Logs without any recognisable state would all end up in one big empty path
+    paths = {i: path for i, path in paths.items() if path}
+    clusters = cluster_paths(paths, threshold=similarity)
+    return [
+        {
+            "size": c.size,
+            "share": round(c.size / len(paths), 3),
+            "representative_dialog_id": c.representative,
+            "path": list(c.path),
+        }
+        for c in clusters[:top]
+    ]
 
 
 @mcp.tool()
+@profiled
 def search_numbers(search_term: str | None = None) -> list[str]:
     """Search (phone) numbers with optional search term.
 
     Args:
         search_term: Optional search term to filter numbers
     """
-    client = IntegrationsClient()
+    client = get_client(IntegrationsClient)
     return client.search_numbers(search_term=search_term)
 
 
 @mcp.tool()
+@profiled
 def search_variable_collections(search_term: str | None = None) -> list[str]:
     """Search variable collections with optional search term.
 
     Args:
         search_term: Optional search term to filter variable collections
     """
-    client = EnvironmentsManagerClient()
+    client = get_client(EnvironmentsManagerClient)
     return client.get_variable_collections(search_term=search_term)
 
 
 @mcp.tool()
+@profiled
 def get_collection_variables(collection_id: str) -> list[str]:
     """Get a list of all variables in a collection.
 
     Args:
         collection_id: The ID of the collection to get variables for
     """
-    client = EnvironmentsManagerClient()
+    _claim("collection", None, collection_id)
+    client = get_client(EnvironmentsManagerClient)
     return client.get_collection_variables(collection_id=collection_id)
+
+
+@mcp.tool()
+@profiled
+def diff_variable_collections(
+    source_environment: str,
+    target_environment: str,
+    collections: list[str] | None = None,
+) -> dict:
+    """Compare the variable collections of two environments, e.g. staging and production, matched by collection name and variable key.
+    All collections are read concurrently. Returns only what differs: the collections found in one environment only, and for each other collection the keys of the variables added, changed or removed in the source.
+
+    Args:
+        source_environment: Environment to promote from, as returned by list_environments
+        target_environment: Environment to compare against, as returned by list_environments
+        collections: Names of the collections to compare. Defaults to all of them
+    """
+    source, target = fan_out(
+        lambda name: export_collections(get_client(EnvironmentsManagerClient, name), collections),
+        [source_environment, target_environment],
+    ).values()
+    for result in (source, target):
+        if isinstance(result, Exception):
+            raise result
+    return diff_collections(source, target)
+
+
+@mcp.tool()
+@profiled
+def sync_variable_collections(
+    source_environment: str,
+    target_environment: str,
+    collections: list[str] | None = None,
+    dry_run: bool = True,
+) -> dict:
+    """Copy the added and changed variables of the source environment's collections to the collections of the same name in the target environment.
+    Only the variables that differ are written, in batches. Variables found only in the target are reported but never deleted, and collections missing from the target are not created.
+    Runs as a dry run by default: always show the user the report and get their confirmation before calling again with dry_run false.
+
+    Args:
+        source_environment: Environment to promote from, as returned by list_environments
+        target_environment: Environment to update, as returned by list_environments
+        collections: Names of the collections to sync. Defaults to all of them
+        dry_run: Only report what would be written. Defaults to True
+    """
+    if get_environment(source_environment) == get_environment(target_environment):
+        raise ValueError("The source and target environments must differ.")
+    return sync_collections(
+        get_client(EnvironmentsManagerClient, source_environment),
+        get_client(EnvironmentsManagerClient, target_environment),
+        names=collections,
+        dry_run=dry_run,
+    )
+
+
+@mcp.tool()
+@profiled
+async def watch_changes(
+    since: int = 0, environment: str | None = None, ctx: Context = None
+) -> dict:
+    """Watch miniapps, Orchestrator apps and variable collections for changes. Can also be requested by users by saying
+    "what changed", "tell me when an app changes" or "watch for updates"
+    The first call starts watching. Later calls return what changed since then; pass the last_seq of the previous call as since to only get newer changes.
+    The client is notified that the ocp://changes/{environment} resource was updated whenever something changes.
+
+    Args:
+        since: Only return changes with a sequence number above this one. Defaults to 0, all the changes kept
+        environment: Optional name of the environment to watch. Defaults to the default environment.
+
+    Returns:
+        The changes, each with its seq, kind, change (added, removed or modified), id and name, and the last_seq seen
+    """
+    watcher = await anyio.to_thread.run_sync(get_watcher, environment)
+    if ctx is not None:
+        _notify_changes(ctx, watcher)
+    return _changes(watcher, since)
+
+
+@mcp.resource("ocp://changes/{environment}")
+def changes_resource(environment: str) -> dict:
+    """The miniapps, Orchestrator apps and variable collections that changed in an environment since watch_changes started watching it."""
+    return _changes(get_watcher(environment))
+
+
+def _changes(watcher, since: int = 0) -> dict:
+    events = watcher.events(since)
+    return {
+        "environment": watcher.environment,
+        "watching": list(watcher.kinds),
+        "changes": [e.to_dict() for e in events],
+        "last_seq": events[-1].seq if events else since,
+    }
+
+
+_notified_sessions = set()
+
+
+def _notify_changes(ctx: Context, watcher):
+    """Sends the session a resource updated notification whenever the watcher finds changes."""
+    session = ctx.session
+    key = (id(session), watcher.environment)
+    if key in _notified_sessions:
+        return
+    _notified_sessions.add(key)
+    loop = asyncio.get_running_loop()
+    uri = AnyUrl(f"ocp://changes/{watcher.environment}")
+
+    def notify(events):
+        try:
+            asyncio.run_coroutine_threadsafe(session.send_resource_updated(uri), loop).result(10)
+        except Exception:
+            # The session is gone
+            unsubscribe()
+            _notified_sessions.discard(key)
+
+    unsubscribe = watcher.subscribe(notify)
+
+
+@mcp.tool()
+@profiled
+def get_prefetch_stats() -> dict:
+    """Report how often prefetching related resources in the background paid off, per kind of resource.
+    Prefetching is turned on by setting OCP_PREFETCH.
+
+    Returns:
+        Whether prefetching is enabled and, per kind, the prefetches started, completed, failed and dropped,
+        the requests served by a prefetch (hits) or not (misses), hit_rate (share of requests served by a prefetch)
+        and used_rate (share of prefetches that served a request)
+    """
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return {"enabled": False}
+    return {"enabled": True, "kinds": prefetcher.stats()}
+
+
+@mcp.tool()
+def configure_profiling(
+    enabled: bool = True,
+    tools: list[str] | None = None,
+    every: int = 1,
+    memory: bool = False,
+) -> dict:
+    """Turn profiling of tool calls on or off, to find out where the time of a slow tool goes (network, JSON decoding or our own code).
+    Each profiled call writes a collapsed-stack file for flame graphs (flamegraph.pl, speedscope) and, with memory, a tracemalloc snapshot.
+    This is an admin tool; only use it when asked to profile the server.
+
+    Args:
+        enabled: Whether to profile. Defaults to True
+        tools: Names of the tools to profile. Defaults to every tool
+        every: Only profile every Nth call of each tool. Defaults to 1, every call
+        memory: Also record memory allocations. Slows profiled calls down noticeably. Defaults to False
+
+    Returns:
+        The profiling settings and the files written for the last profiled calls
+    """
+    if enabled:
+        profiling.configure(tools=tools, every=every, memory=memory)
+    else:
+        profiling.disable()
+    return profiling.status()
+
+
+# Tools that can be called through run_tools. Only read-only tools: concurrent
+# read-modify-write calls such as set_miniapp_prompt would overwrite each other.
+# get_slowest_states is left out as well since it may start a process pool,
+# which must not be forked from a worker thread.
+_BATCH_TOOLS = {
+    fn.__name__: fn
+    for fn in (
+        list_environments,
+        search_miniapps,
+        get_miniapp,
+        get_dialog_logs,
+        search_orchestrator_apps,
+        get_orchestrator_app,
+        diff_orchestrator_apps,
+        search_dialog_logs,
+        query_dialogs,
+        cluster_dialog_paths,
+        search_numbers,
+        search_variable_collections,
+        get_collection_variables,
+        diff_variable_collections,
+        get_prefetch_stats,
+    )
+}
+
+
+def _call_tool(tool: str, arguments: dict):
+    if tool not in _BATCH_TOOLS:
+        raise ValueError(
+            f"Unknown tool '{tool}'. Must be one of: {', '.join(_BATCH_TOOLS)}"
+        )
+    result = _BATCH_TOOLS[tool](**arguments)
+    # Async tools run on an event loop of their own, in the batch worker thread
+    if inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+@mcp.tool()
+@profiled
+def run_tools(calls: list[dict], max_concurrency: int = 8) -> list[dict]:
+    """Run many tool calls at once instead of one at a time. Useful to inspect several miniapps, canvases or dialogs in a single step.
+    Only read-only tools can be run this way; make changes with separate tool calls.
+
+    Args:
+        calls: List of tool calls. Each one is a dictionary with:
+            - "tool": The name of the tool to call, e.g. "get_miniapp"
+            - "arguments": The arguments of the tool, e.g. {"miniapp_id": "..."}
+            - "id" (optional): A name for the call, used in depends_on. Defaults to its position in the list
+            - "depends_on" (optional): List of ids of calls that must succeed before this one starts
+        max_concurrency: Maximum number of calls running at the same time. Defaults to 8
+
+    Returns:
+        One entry per call, in the same order, with its id, tool and either its "result" or its "error"
+    """
+    return run_batch(calls, _call_tool, max_concurrency=max_concurrency)
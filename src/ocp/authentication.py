@@ -1,20 +1,31 @@
 import requests
+import threading
 import time
 from dotenv import load_dotenv
 import os
 
+from . import transport
+from .cache import get_shared_store
+
 load_dotenv()
 
 
 class Authentication:
-    def __init__(self):
-        self.host = os.getenv("OCP_HOST")
-        self.username = os.getenv("OCP_USERNAME")
-        self.password = os.getenv("OCP_PASSWORD")
+    def __init__(self, environment=None):
+        if environment is not None:
+            self.host = environment.host
+            self.username = environment.username
+            self.password = environment.password
+        else:
+            self.host = os.getenv("OCP_HOST")
+            self.username = os.getenv("OCP_USERNAME")
+            self.password = os.getenv("OCP_PASSWORD")
 
         self._access_token = None
         self._refresh_token = None
         self._token_expiry = None
+        # Clients may fetch concurrently; only one of them should log in
+        self._lock = threading.Lock()
 
     def __enter__(self):
         self.get_token()
@@ -28,14 +39,56 @@ class Authentication:
         Gets the access token. Returns existing token if valid, refreshes if expired,
         or generates new one if none exists.
         """
-        current_time = time.time()
+        with self._lock:
+            if self._token_is_valid():
+                return self._access_token
 
-        # Return existing token if valid
-        if (
+            store = get_shared_store()
+            if store is None:
+                return self._get_token()
+
+            # Another MCP server process on this host may have logged in already
+            if self._load_shared_token(store):
+                return self._access_token
+            with store.lock():
+                if self._load_shared_token(store):
+                    return self._access_token
+                token = self._get_token()
+                if token is not None:
+                    store.set_token(
+                        self._store_key,
+                        self._access_token,
+                        self._refresh_token,
+                        self._token_expiry,
+                    )
+                return token
+
+    @property
+    def _store_key(self):
+        return f"{self.host}|{self.username}"
+
+    def _token_is_valid(self):
+        return (
             self._access_token is not None
             and self._token_expiry is not None
-            and current_time < self._token_expiry
-        ):
+            and time.time() < self._token_expiry
+        )
+
+    def _load_shared_token(self, store):
+        """
+        Adopts the tokens stored by another process. Returns True if the access token is still valid.
+        """
+        token = store.get_token(self._store_key)
+        if token is None:
+            return False
+        self._access_token = token["access_token"]
+        self._refresh_token = token["refresh_token"] or self._refresh_token
+        self._token_expiry = token["expiry"]
+        return self._token_is_valid()
+
+    def _get_token(self):
+        # Return existing token if valid
+        if self._token_is_valid():
             return self._access_token
 
         # Refresh token if we have one
@@ -57,7 +110,7 @@ class Authentication:
             "password": self.password,
         }
 
-        response = requests.post(url, headers=headers, data=data)
+        response = transport.post(url, headers=headers, data=data)
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
@@ -83,7 +136,7 @@ class Authentication:
             "grant_type": "refresh_token",
             "refresh_token": self._refresh_token,
         }
-        response = requests.post(url, headers=headers, data=data)
+        response = transport.post(url, headers=headers, data=data)
         response.raise_for_status()
         token = response.json()
         self._access_token = token["access_token"]
@@ -98,7 +151,7 @@ class Authentication:
         url = f"{self.host}/auth/realms/master/protocol/openid-connect/logout"
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         data = {"client_id": "ocp", "refresh_token": self._refresh_token}
-        response = requests.post(url, headers=headers, data=data)
+        response = transport.post(url, headers=headers, data=data)
         try:
             response.raise_for_status()
             print("Token successfully revoked")
@@ -109,7 +162,7 @@ class Authentication:
     def check_token(self):
         url = f"{self.host}/miniapps/api/apps?pageSize=1"
         headers = {"Authorization": f"Bearer {self._access_token}"}
-        response = requests.get(url, headers=headers)
+        response = transport.get(url, headers=headers)
 
         # A 200 OK response means the token is active and valid.
         is_valid = response.status_code == 200
@@ -1,5 +1,8 @@
-import requests
+import json
+from . import transport
 from .authentication import Authentication
+from .cache import get_response_cache
+from .ratelimit import get_rate_limiter
 
 
 class BaseClient:
@@ -8,9 +11,19 @@ class BaseClient:
     It handles token acquisition and adds the Authorization header to each request.
     """
 
-    def __init__(self):
-        self.auth = Authentication()
+    def __init__(self, environment=None):
+        self.environment = environment
+        self.auth = Authentication(environment)
         self.base_url = self.auth.host
+        self.cache, self.cache_ttl = get_response_cache()
+
+    @property
+    def rate_limiter(self):
+        """
+        The rate limiter of the host requests go to. Subclasses may point `base_url`
+        at another host (e.g. the analytics stack), which then has its own budget.
+        """
+        return get_rate_limiter(self.base_url)
 
     def _get_auth_headers(self):
         """
@@ -21,18 +34,99 @@ class BaseClient:
             raise Exception("Failed to acquire authentication token.")
         return {"Authorization": f"Bearer {token}"}
 
+    def _cache_key(self, url, params=None):
+        # Responses depend on who asks, so they are scoped to the login
+        scope = f"#{self.auth.host}|{self.auth.username}"
+        if not params:
+            return url + scope
+        return f"{url}?{json.dumps(params, sort_keys=True, default=str)}{scope}"
+
+    def _invalidate(self, endpoint):
+        """
+        Drops the cached responses of a written resource, of what lies below it,
+        and of the collections above it (e.g. the listing that includes it).
+        """
+        if self.cache is None:
+            return
+        self.cache.invalidate(f"{self.base_url}/{endpoint.strip('/')}")
+        parts = endpoint.strip("/").split("/")
+        for i in range(1, len(parts)):
+            self.cache.invalidate(
+                f"{self.base_url}/{'/'.join(parts[:i])}", subtree=False
+            )
+
     def get(self, endpoint, **kwargs):
         """
         Performs a GET request to a specified endpoint with authentication.
+        Responses are served from the response cache when one is configured.
         """
+        url = f"{self.base_url}/{endpoint}"
+        cache_key = self._cache_key(url, kwargs.get("params"))
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         headers = self._get_auth_headers()
         if 'headers' in kwargs:
             headers.update(kwargs.pop('headers'))
-        
+
+        self.rate_limiter.acquire()
+        response = transport.get(url, headers=headers, **kwargs)
+        response.raise_for_status()
+        data = response.json()
+        if self.cache is not None:
+            self.cache.set(cache_key, data, self.cache_ttl)
+        return data
+
+    def get_content(self, endpoint, **kwargs) -> bytes:
+        """
+        Performs a GET request and returns the undecoded response body, for callers
+        decoding it into typed models. It bypasses the response cache.
+        """
+        headers = self._get_auth_headers()
+        if 'headers' in kwargs:
+            headers.update(kwargs.pop('headers'))
+
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=headers, **kwargs)
+        self.rate_limiter.acquire()
+        response = transport.get(url, headers=headers, **kwargs)
         response.raise_for_status()
-        return response.json()
+        return response.content
+
+    def get_conditional(self, endpoint, etag=None, **kwargs) -> tuple:
+        """
+        Performs a conditional GET request, sending the ETag of the last response seen.
+        Returns the undecoded response body and its ETag, with a body of None if the
+        resource has not changed since. It bypasses the response cache.
+        """
+        headers = self._get_auth_headers()
+        if 'headers' in kwargs:
+            headers.update(kwargs.pop('headers'))
+        if etag:
+            headers["If-None-Match"] = etag
+
+        url = f"{self.base_url}/{endpoint}"
+        self.rate_limiter.acquire()
+        response = transport.get(url, headers=headers, **kwargs)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.content, response.headers.get("ETag")
+
+    def post_content(self, endpoint, **kwargs) -> bytes:
+        """
+        Performs a POST request and returns the undecoded response body.
+        """
+        headers = self._get_auth_headers()
+        if 'headers' in kwargs:
+            headers.update(kwargs.pop('headers'))
+
+        url = f"{self.base_url}/{endpoint}"
+        self.rate_limiter.acquire()
+        response = transport.post(url, headers=headers, **kwargs)
+        response.raise_for_status()
+        return response.content
 
     def post(self, endpoint, **kwargs):
         """
@@ -43,7 +137,8 @@ class BaseClient:
             headers.update(kwargs.pop('headers'))
 
         url = f"{self.base_url}/{endpoint}"
-        response = requests.post(url, headers=headers, **kwargs)
+        self.rate_limiter.acquire()
+        response = transport.post(url, headers=headers, **kwargs)
         return response.json()
 
     def put(self, endpoint, **kwargs):
@@ -55,8 +150,10 @@ class BaseClient:
             headers.update(kwargs.pop('headers'))
 
         url = f"{self.base_url}/{endpoint}"
-        response = requests.put(url, headers=headers, **kwargs)
+        self.rate_limiter.acquire()
+        response = transport.put(url, headers=headers, **kwargs)
         response.raise_for_status()
+        self._invalidate(endpoint)
         return response.json()
 
     def delete(self, endpoint, **kwargs):
@@ -68,8 +165,10 @@ class BaseClient:
             headers.update(kwargs.pop('headers'))
 
         url = f"{self.base_url}/{endpoint}"
-        response = requests.delete(url, headers=headers, **kwargs)
+        self.rate_limiter.acquire()
+        response = transport.delete(url, headers=headers, **kwargs)
         response.raise_for_status()
+        self._invalidate(endpoint)
         # Delete requests often return 204 No Content, which has no JSON body
         if response.status_code != 204:
             return response.json()
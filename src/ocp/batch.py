@@ -0,0 +1,85 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_batch(invocations: list, call, max_concurrency: int = 8) -> list[dict]:
+    """Runs a list of tool invocations concurrently, honouring their dependencies.
+
+    Each invocation is a dict with the `tool` to call and its `arguments`, and
+    optionally an `id` and `depends_on`, a list of the ids (or positions) of the
+    invocations that must succeed before it starts. Invocations without pending
+    dependencies run in parallel, at most `max_concurrency` at a time; the requests
+    they make share the clients' rate limits. An invocation whose dependency
+    failed is not run.
+
+    Args:
+        invocations (list): The tool invocations
+        call (callable): Runs one invocation, as `call(tool, arguments)`
+        max_concurrency (int, optional): Maximum number of invocations running at once. Defaults to 8
+
+    Returns:
+        list[dict]: One entry per invocation, in input order, holding its `id`, `tool` and
+            either its `result` or its `error`
+    """
+    ids = [str(inv.get("id", i)) for i, inv in enumerate(invocations)]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Invocation ids must be unique.")
+    position = {id_: i for i, id_ in enumerate(ids)}
+
+    pending = {}
+    for i, inv in enumerate(invocations):
+        if "tool" not in inv:
+            raise ValueError(f"Invocation '{ids[i]}' has no tool.")
+        deps = set()
+        for dep in inv.get("depends_on") or []:
+            dep = str(dep)
+            if dep not in position:
+                raise ValueError(f"Invocation '{ids[i]}' depends on unknown invocation '{dep}'.")
+            deps.add(position[dep])
+        pending[i] = deps
+
+    results = [None] * len(invocations)
+    failed = set()
+    done = set()
+
+    def run(i):
+        inv = invocations[i]
+        return call(inv["tool"], inv.get("arguments") or {})
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        running = {}
+        while pending or running:
+            skipped = True
+            while skipped:
+                # Skipping an invocation can fail the ones that depend on it in turn
+                skipped = False
+                for i, deps in list(pending.items()):
+                    if deps & failed:
+                        bad = sorted(ids[d] for d in deps & failed)
+                        results[i] = {"error": f"Skipped: dependency {', '.join(bad)} failed."}
+                        failed.add(i)
+                        del pending[i]
+                        skipped = True
+                    elif deps <= done:
+                        running[pool.submit(run, i)] = i
+                        del pending[i]
+
+            if not running:
+                # Whatever is left waits on itself
+                for i in pending:
+                    results[i] = {"error": "Skipped: circular dependency."}
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = running.pop(future)
+                try:
+                    results[i] = {"result": future.result()}
+                    done.add(i)
+                except Exception as e:
+                    results[i] = {"error": f"{type(e).__name__}: {e}"}
+                    failed.add(i)
+
+    return [
+        {"id": ids[i], "tool": inv["tool"], **results[i]}
+        for i, inv in enumerate(invocations)
+    ]
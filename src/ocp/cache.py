@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def _matches(key: str, path: str, subtree: bool) -> bool:
+    """Tells whether a cache key belongs to a resource path.
+
+    Keys are `<url>[?<params>]#<scope>`. A path matches its own keys whatever
+    their params and scope and, with `subtree`, the keys of the paths below it,
+    but never those of a sibling that merely shares a prefix (`apps/1` vs `apps/10`).
+    """
+    if not path:
+        return True
+    if not key.startswith(path):
+        return False
+    rest = key[len(path) :]
+    if not rest or rest[:1] in ("?", "#") or (subtree and rest[:1] == "/"):
+        return True
+    # The same resource written with a trailing slash
+    return rest[:1] == "/" and rest[1:2] in ("?", "#")
+
+
+class MemoryCache:
+    """A thread-safe, size-bounded in-process cache of read responses with a TTL.
+
+    Values are stored serialised, so a caller changing the dict it got back
+    cannot change what the next caller reads.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(entry[1])
+
+    def set(self, key: str, value, ttl: float):
+        """Caches a JSON serialisable value for `ttl` seconds."""
+        value = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str = "", subtree: bool = True) -> int:
+        """Drops the entries of a resource path (see `_matches`). Returns the number dropped."""
+        with self._lock:
+            keys = [k for k in self._entries if _matches(k, path, subtree)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+
+class SharedStore:
+    """A token store and response cache shared by the MCP server processes of a host.
+
+    Backed by a SQLite database in WAL mode, so readers in one process never block
+    on a writer in another. Every thread uses its own connection. The database
+    holds access and refresh tokens in plain text, so it is only readable and
+    writable by its owner.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # SQLite gives the -wal and -shm files the permissions of the database
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "key TEXT PRIMARY KEY, access_token TEXT, refresh_token TEXT, expiry REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get_token(self, key: str) -> dict | None:
+        """Returns the stored access token, refresh token and expiry for a login."""
+        row = self._connection().execute(
+            "SELECT access_token, refresh_token, expiry FROM tokens WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"access_token": row[0], "refresh_token": row[1], "expiry": row[2]}
+
+    def set_token(self, key: str, access_token: str, refresh_token: str | None, expiry: float):
+        """Stores the tokens of a login."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?)",
+                (key, access_token, refresh_token, expiry),
+            )
+
+    @contextmanager
+    def lock(self):
+        """Holds the database write lock, serialising logins across processes."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.execute("COMMIT")
+
+    def get(self, key: str):
+        """Returns the cached value, or None if it is missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM responses WHERE key = ? AND expires > ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: float):
+        """Caches a JSON serialisable value for `ttl` seconds."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl),
+            )
+            conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+
+    def invalidate(self, path: str = "", subtree: bool = True) -> int:
+        """Drops the entries of a resource path (see `_matches`). Returns the number dropped."""
+        with self._transaction() as conn:
+            keys = [
+                (row[0],)
+                for row in conn.execute(
+                    "SELECT key FROM responses WHERE substr(key, 1, ?) = ?",
+                    (len(path), path),
+                )
+                if _matches(row[0], path, subtree)
+            ]
+            conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+            return len(keys)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are managed explicitly
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        if conn.in_transaction:
+            # Already inside `lock()`
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+_shared_store = None
+_response_cache = None
+_lock = threading.Lock()
+
+
+def get_shared_store() -> SharedStore | None:
+    """Returns the store configured by `OCP_SHARED_STORE`, or None if it is not set."""
+    global _shared_store
+    with _lock:
+        if _shared_store is None:
+            path = os.environ.get("OCP_SHARED_STORE")
+            _shared_store = SharedStore(os.path.expanduser(path)) if path else False
+    return _shared_store or None
+
+
+def get_response_cache() -> tuple:
+    """Returns the process-wide response cache and its TTL in seconds.
+
+    Responses are cached only when `OCP_CACHE_TTL` is set. They go to the shared
+    store when one is configured and stay in-process otherwise.
+    """
+    global _response_cache
+    ttl = float(os.environ.get("OCP_CACHE_TTL") or 0)
+    if ttl <= 0:
+        return None, 0
+    store = get_shared_store()
+    with _lock:
+        if _response_cache is None:
+            _response_cache = store or MemoryCache()
+    return _response_cache, ttl
@@ -0,0 +1,142 @@
+import hashlib
+
+from .models import Canvas, Node, dumps
+
+# Node keys that only describe how the canvas is drawn
+LAYOUT_KEYS = frozenset(
+    {"position", "positionAbsolute", "width", "height", "selected", "dragging", "zIndex"}
+)
+
+
+def _content(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if k not in LAYOUT_KEYS}
+
+
+def _content_digest(node: Node) -> str:
+    """Hashes what a node does, leaving out its ID and layout, to match copies of it."""
+    doc = _content(node.data)
+    doc.pop("id", None)
+    return hashlib.blake2b(dumps(doc), digest_size=8).hexdigest()
+
+
+def _changed_fields(base: dict, target: dict, prefix: str = "", depth: int = 2) -> list:
+    """Lists the dotted paths, at most `depth` keys deep, whose values differ."""
+    fields = []
+    for key in sorted(base.keys() | target.keys(), key=str):
+        a, b = base.get(key), target.get(key)
+        if a == b:
+            continue
+        path = f"{prefix}{key}"
+        if depth > 1 and isinstance(a, dict) and isinstance(b, dict):
+            fields.extend(_changed_fields(a, b, f"{path}.", depth - 1))
+        else:
+            fields.append(path)
+    return fields
+
+
+def _summary(node: Node) -> dict:
+    return {"id": node.id, "type": node.type, "name": node.name}
+
+
+def diff_canvases(base: Canvas, target: Canvas) -> dict:
+    """Compares two canvases and returns what changed from `base` to `target`.
+
+    Nodes are matched by ID, then the nodes left over on each side by a hash of
+    their content, so that a node copied to another app under a new ID is not
+    reported as removed and added. Edges are compared as connections between the
+    matched nodes: an output that now leads to another node is reported as
+    rewired. Changes to the layout alone are reported as moved. It runs in linear
+    time, decoding only the nodes that differ.
+
+    Returns:
+        dict: The added, removed, modified and moved nodes, the added, removed and
+            rewired edges, and the nodes matched by content. Node IDs are those of
+            `base`, except for nodes only found in `target`.
+    """
+    base_nodes = {n.id: n for n in base.nodes}
+    target_nodes = {n.id: n for n in target.nodes}
+
+    modified, moved = [], []
+    unchanged = 0
+    for node_id in base_nodes.keys() & target_nodes.keys():
+        a, b = base_nodes[node_id], target_nodes[node_id]
+        if a.raw == b.raw:
+            unchanged += 1
+            continue
+        fields = _changed_fields(_content(a.data), _content(b.data))
+        if fields:
+            modified.append({**_summary(b), "fields": fields})
+        else:
+            moved.append(node_id)
+
+    # Pair the nodes left over on each side that do the same thing
+    removed = {i: n for i, n in base_nodes.items() if i not in target_nodes}
+    added = {i: n for i, n in target_nodes.items() if i not in base_nodes}
+    by_digest = {}
+    for node_id, node in removed.items():
+        by_digest.setdefault(_content_digest(node), []).append(node_id)
+    to_base = {}
+    for node_id, node in added.items():
+        candidates = by_digest.get(_content_digest(node))
+        if candidates:
+            to_base[node_id] = candidates.pop(0)
+    for target_id, base_id in to_base.items():
+        del added[target_id]
+        del removed[base_id]
+
+    def connections(edges, mapping):
+        return {
+            (
+                mapping.get(e.source, e.source),
+                e.source_handle,
+                mapping.get(e.target, e.target),
+                e.target_handle,
+            )
+            for e in edges
+        }
+
+    base_edges = connections(base.edges, {})
+    target_edges = connections(target.edges, to_base)
+    removed_edges = base_edges - target_edges
+    added_edges = target_edges - base_edges
+
+    # An output that leads somewhere else now was rewired rather than replaced
+    outputs = {}
+    for edge in added_edges:
+        outputs.setdefault(edge[:2], []).append(edge)
+    rewired = []
+    for edge in sorted(removed_edges, key=str):
+        replacements = outputs.get(edge[:2])
+        if replacements:
+            new = replacements.pop(0)
+            removed_edges.discard(edge)
+            added_edges.discard(new)
+            rewired.append(
+                {"source": edge[0], "source_handle": edge[1], "from": edge[2], "to": new[2]}
+            )
+
+    def edge_summary(edge):
+        return {
+            "source": edge[0],
+            "source_handle": edge[1],
+            "target": edge[2],
+            "target_handle": edge[3],
+        }
+
+    return {
+        "base": {"id": base.id, "name": base.name, "nodes": len(base.nodes), "edges": len(base.edges)},
+        "target": {"id": target.id, "name": target.name, "nodes": len(target.nodes), "edges": len(target.edges)},
+        "unchanged_nodes": unchanged + len(to_base),
+        "nodes": {
+            "added": [_summary(n) for n in added.values()],
+            "removed": [_summary(n) for n in removed.values()],
+            "modified": sorted(modified, key=lambda n: n["id"]),
+            "moved": sorted(moved),
+            "matched_by_content": [{"base": b, "target": t} for t, b in to_base.items()],
+        },
+        "edges": {
+            "added": [edge_summary(e) for e in sorted(added_edges, key=str)],
+            "removed": [edge_summary(e) for e in sorted(removed_edges, key=str)],
+            "rewired": rewired,
+        },
+    }
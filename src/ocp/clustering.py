@@ -0,0 +1,134 @@
+import hashlib
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .dialog_logs import parse_steps
+
+# Mersenne prime used for the universal hash family of the permutations
+_PRIME = (1 << 61) - 1
+
+
+@dataclass
+class PathCluster:
+    """A group of dialogs that went through the same (or a very similar) path."""
+
+    path: tuple
+    representative: str
+    dialog_ids: list = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.dialog_ids)
+
+
+def path_signature(log_text: str) -> tuple:
+    """Turns a raw dialog log into the sequence of states it went through.
+
+    Consecutive repetitions of a state (re-prompts, retries) are collapsed so that
+    dialogs that only differ in how often they looped end up with the same path.
+    """
+    path = []
+    for step in parse_steps(log_text):
+        if not path or path[-1] != step.state:
+            path.append(step.state)
+    return tuple(path)
+
+
+class MinHasher:
+    """MinHash signatures over the state n-grams of a path."""
+
+    def __init__(self, num_perm: int = 64, ngram: int = 2, seed: int = 1):
+        self.num_perm = num_perm
+        self.ngram = ngram
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)
+        ]
+
+    def shingles(self, path: tuple) -> set:
+        """Returns the hashed n-grams of a path."""
+        if len(path) < self.ngram:
+            grams = [path]
+        else:
+            grams = [path[i : i + self.ngram] for i in range(len(path) - self.ngram + 1)]
+        return {
+            int.from_bytes(
+                hashlib.blake2b("\x1f".join(g).encode(), digest_size=8).digest(), "big"
+            )
+            for g in grams
+        }
+
+    def signature(self, path: tuple) -> tuple:
+        """Returns the MinHash signature of a path."""
+        shingles = self.shingles(path)
+        return tuple(
+            min((a * s + b) % _PRIME for s in shingles) for a, b in self._perms
+        )
+
+    @staticmethod
+    def similarity(a: tuple, b: tuple) -> float:
+        """Estimates the Jaccard similarity of two paths from their signatures."""
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def cluster_paths(
+    paths: dict, threshold: float = 0.8, num_perm: int = 64, bands: int = 16
+) -> list[PathCluster]:
+    """Groups dialogs into path clusters in close to linear time.
+
+    Dialogs with identical paths are grouped first, which is exact and usually
+    collapses most of the input. The distinct paths that remain are MinHashed and
+    bucketed with locality sensitive hashing; paths that share a bucket and whose
+    estimated similarity reaches `threshold` are merged into one cluster.
+
+    Args:
+        paths (dict): The path of each dialog, keyed by dialog ID
+        threshold (float, optional): Minimum Jaccard similarity of merged paths. Use 1.0 for exact paths only. Defaults to 0.8
+        num_perm (int, optional): Number of MinHash permutations. Defaults to 64
+        bands (int, optional): Number of LSH bands; must divide `num_perm`. Defaults to 16
+
+    Returns:
+        list[PathCluster]: The clusters, largest first
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be a multiple of bands.")
+
+    exact = defaultdict(list)
+    for dialog_id, path in paths.items():
+        exact[path].append(dialog_id)
+    distinct = sorted(exact, key=lambda p: len(exact[p]), reverse=True)
+
+    parent = list(range(len(distinct)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if threshold < 1.0 and len(distinct) > 1:
+        hasher = MinHasher(num_perm=num_perm)
+        signatures = [hasher.signature(p) for p in distinct]
+        rows = num_perm // bands
+        for band in range(bands):
+            buckets = defaultdict(list)
+            for i, signature in enumerate(signatures):
+                buckets[signature[band * rows : (band + 1) * rows]].append(i)
+            for members in buckets.values():
+                for other in members[1:]:
+                    root, other_root = find(members[0]), find(other)
+                    if root == other_root:
+                        continue
+                    if hasher.similarity(signatures[members[0]], signatures[other]) >= threshold:
+                        # Keep the most frequent path as the root of the cluster
+                        parent[max(root, other_root)] = min(root, other_root)
+
+    clusters = {}
+    for i, path in enumerate(distinct):
+        root = find(i)
+        if root not in clusters:
+            clusters[root] = PathCluster(path=distinct[root], representative=exact[distinct[root]][0])
+        clusters[root].dialog_ids.extend(exact[path])
+
+    return sorted(clusters.values(), key=lambda c: c.size, reverse=True)
@@ -0,0 +1,201 @@
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class Step:
+    """A single step of a dialog, as recovered from its log."""
+
+    state: str
+    integration: str | None = None
+    started_ms: float | None = None
+    duration_ms: float | None = None
+
+
+# Keys the dialog log uses (or has used) for the same piece of information.
+_STEP_LIST_KEYS = ("steps", "events", "entries", "log")
+_STATE_KEYS = ("state", "state_name", "stateName", "step", "name", "task")
+_INTEGRATION_KEYS = ("integration", "integration_name", "integrationName", "service")
+_TIME_KEYS = ("timestamp", "time", "start", "startTime", "started_at", "ts")
+_DURATION_KEYS = ("duration_ms", "durationMs", "elapsed_ms", "elapsedMs", "duration")
+
+_LINE_RE = re.compile(
+    r"^\s*\[?(?P<ts>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\]?\s*(?P<rest>.*)$"
+)
+_STATE_RE = re.compile(r"\bstate\s*[=:]\s*\"?(?P<value>[^\s\",;]+)", re.IGNORECASE)
+_INTEGRATION_RE = re.compile(
+    r"\bintegration\s*[=:]\s*\"?(?P<value>[^\s\",;]+)", re.IGNORECASE
+)
+_END_KEYS = ("end_time", "endTime", "ended_at", "endedAt", "end_ms", "endMs")
+_CLOSED_STATUSES = {"closed", "completed", "ended", "finished", "hangup", "terminated"}
+_END_LINE_RE = re.compile(
+    r"\b(?:(?:dialog|call|session)\s+(?:ended|closed|completed|finished|terminated)|hang\s?up)\b",
+    re.IGNORECASE,
+)
+_DURATION_RE = re.compile(
+    r"\b(?:duration|elapsed)(?:_ms)?\s*[=:]\s*(?P<value>\d+(?:\.\d+)?)\s*(?:ms)?\b",
+    re.IGNORECASE,
+)
+
+
+def parse_steps(log_text: str) -> list[Step]:
+    """Parses the raw text returned by `InsightsClient.get_dialog_log` into steps.
+
+    Both the JSON form of the log (a list of step objects, or an object holding
+    one) and the line-oriented text form (`<timestamp> ... state=<name> ...`) are
+    understood. Steps that do not carry an explicit duration get one from the
+    start of the step that follows them.
+
+    Args:
+        log_text (str): The dialog log as returned by the insights API
+
+    Returns:
+        list[Step]: The steps of the dialog in chronological order
+    """
+    if not log_text:
+        return []
+
+    try:
+        document = json.loads(log_text)
+    except ValueError:
+        steps = _parse_text(log_text)
+    else:
+        steps = _parse_json(document)
+
+    return _fill_durations(steps)
+
+
+def is_dialog_closed(log_text: str) -> bool:
+    """Tells whether a dialog log belongs to a dialog that has finished.
+
+    The log of a finished dialog never changes again. When the log does not say
+    that the dialog ended, it is treated as still in progress.
+    """
+    if not log_text:
+        return False
+
+    try:
+        document = json.loads(log_text)
+    except ValueError:
+        lines = log_text.rstrip().splitlines()
+        return bool(lines) and bool(_END_LINE_RE.search(lines[-1]))
+
+    if not isinstance(document, dict):
+        return False
+    if _first(document, _END_KEYS) is not None:
+        return True
+    return str(document.get("status", "")).lower() in _CLOSED_STATUSES
+
+
+def _parse_json(document) -> list[Step]:
+    entries = document
+    if isinstance(document, dict):
+        entries = next(
+            (document[k] for k in _STEP_LIST_KEYS if isinstance(document.get(k), list)),
+            [],
+        )
+    if not isinstance(entries, list):
+        return []
+
+    steps = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        state = _name(_first(entry, _STATE_KEYS))
+        if state is None:
+            continue
+        steps.append(
+            Step(
+                state=state,
+                integration=_name(_first(entry, _INTEGRATION_KEYS)),
+                started_ms=_to_ms(_first(entry, _TIME_KEYS)),
+                duration_ms=_to_float(_first(entry, _DURATION_KEYS)),
+            )
+        )
+    return steps
+
+
+def _parse_text(log_text: str) -> list[Step]:
+    steps = []
+    for line in log_text.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        rest = match.group("rest")
+        state = _STATE_RE.search(rest)
+        if not state:
+            continue
+        integration = _INTEGRATION_RE.search(rest)
+        duration = _DURATION_RE.search(rest)
+        steps.append(
+            Step(
+                state=state.group("value"),
+                integration=integration.group("value") if integration else None,
+                started_ms=_to_ms(match.group("ts")),
+                duration_ms=float(duration.group("value")) if duration else None,
+            )
+        )
+    return steps
+
+
+def _fill_durations(steps: list[Step]) -> list[Step]:
+    filled = []
+    for i, step in enumerate(steps):
+        if step.duration_ms is None and step.started_ms is not None:
+            following = steps[i + 1].started_ms if i + 1 < len(steps) else None
+            if following is not None and following >= step.started_ms:
+                step = Step(
+                    step.state,
+                    step.integration,
+                    step.started_ms,
+                    following - step.started_ms,
+                )
+        filled.append(step)
+    return filled
+
+
+def _first(entry: dict, keys: tuple):
+    for key in keys:
+        value = entry.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _name(value) -> str | None:
+    """Returns the name of a state or integration, which may be given as an object."""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("id")
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
+
+
+def _to_float(value) -> float | None:
+    """Returns a duration in milliseconds, or None if the value is not a number."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_ms(value) -> float | None:
+    """Converts an ISO datetime string or a (milli)seconds epoch to milliseconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Epoch seconds are an order of magnitude below any millisecond timestamp
+        return float(value) * 1000 if value < 1e11 else float(value)
+    if isinstance(value, str):
+        if value.replace(".", "", 1).isdigit():
+            return _to_ms(float(value))
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00").replace(",", "."))
+        except ValueError:
+            return None
+        return dt.timestamp() * 1000
+    return None
@@ -0,0 +1,389 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+# Keys each field is read from in a dialog search result, in order of preference
+FIELDS = {
+    "id": ("dialog_id", "dialogId", "id"),
+    "app": ("app", "app_id", "appId"),
+    "ani": ("ani", "caller"),
+    "region": ("region",),
+    "dialog_group": ("dialog_group", "dialogGroup"),
+    "ocp_group_name": ("ocp_group_name", "ocpGroupName"),
+    "duration": ("duration_ms", "durationMs", "duration"),
+    "steps": ("steps", "steps_count", "stepsCount"),
+    "outcome": ("outcome", "end_reason", "endReason", "status"),
+    "intent": ("intent", "intents", "last_intent", "lastIntent"),
+    "start": ("start_ms", "startMs", "start_time", "startTime", "timestamp"),
+}
+# Fields computed from the start time, in UTC
+DERIVED = {
+    "hour": lambda dt: dt.hour,
+    "weekday": lambda dt: dt.isoweekday(),
+    "date": lambda dt: dt.date().isoformat(),
+}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+        |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        |(?P<op>>=|<=|!=|=|>|<|\(|\)|,)
+        |(?P<word>[A-Za-z_][\w.]*)
+    )""",
+    re.VERBOSE,
+)
+_KEYWORDS = {"and", "or", "not", "in", "between", "contains", "exists", "true", "false", "null"}
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Predicate:
+    field: str
+    op: str
+    value: object = None
+
+    def __str__(self):
+        if self.op == "exists":
+            return f"{self.field} exists"
+        if self.op == "between":
+            return f"{self.field} between {_literal(self.value[0])} and {_literal(self.value[1])}"
+        if self.op == "in":
+            return f"{self.field} in ({', '.join(_literal(v) for v in self.value)})"
+        return f"{self.field} {self.op} {_literal(self.value)}"
+
+
+@dataclass(frozen=True)
+class And:
+    terms: tuple
+
+    def __str__(self):
+        return " and ".join(f"({t})" if isinstance(t, Or) else str(t) for t in self.terms)
+
+
+@dataclass(frozen=True)
+class Or:
+    terms: tuple
+
+    def __str__(self):
+        return " or ".join(str(t) for t in self.terms)
+
+
+@dataclass(frozen=True)
+class Not:
+    term: object
+
+    def __str__(self):
+        return f"not ({self.term})"
+
+
+def _literal(value) -> str:
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    if value is None or isinstance(value, bool):
+        return {True: "true", False: "false", None: "null"}[value]
+    return str(value)
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise QueryError(f"Unexpected input at position {position}: {text[position:position + 20]!r}")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "word" and value.lower() in _KEYWORDS:
+                kind, value = "keyword", value.lower()
+            self.tokens.append((kind, value))
+            position = match.end()
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("The query is empty.")
+        node = self.or_expr()
+        if self.position < len(self.tokens):
+            raise QueryError(f"Unexpected {self.tokens[self.position][1]!r}.")
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            expected = value or kind or "more input"
+            raise QueryError(f"Expected {expected!r} but got {token[1]!r}.")
+        self.position += 1
+        return token[1]
+
+    def accept(self, kind, value):
+        if self.peek() == (kind, value):
+            self.position += 1
+            return True
+        return False
+
+    def or_expr(self):
+        terms = [self.and_expr()]
+        while self.accept("keyword", "or"):
+            terms.append(self.and_expr())
+        return terms[0] if len(terms) == 1 else Or(tuple(terms))
+
+    def and_expr(self):
+        terms = [self.not_expr()]
+        while self.accept("keyword", "and"):
+            terms.append(self.not_expr())
+        return terms[0] if len(terms) == 1 else And(tuple(terms))
+
+    def not_expr(self):
+        if self.accept("keyword", "not"):
+            return Not(self.not_expr())
+        if self.accept("op", "("):
+            node = self.or_expr()
+            self.take("op", ")")
+            return node
+        return self.comparison()
+
+    def comparison(self):
+        name = self.take("word")
+        if self.accept("keyword", "exists"):
+            return Predicate(name, "exists")
+        if self.accept("keyword", "in"):
+            self.take("op", "(")
+            values = [self.value()]
+            while self.accept("op", ","):
+                values.append(self.value())
+            self.take("op", ")")
+            return Predicate(name, "in", tuple(values))
+        if self.accept("keyword", "between"):
+            low = self.value()
+            self.take("keyword", "and")
+            return Predicate(name, "between", (low, self.value()))
+        if self.accept("keyword", "contains"):
+            return Predicate(name, "contains", self.value())
+        op = self.take("op")
+        if op not in ("=", "!=", ">", ">=", "<", "<="):
+            raise QueryError(f"Expected a comparison after {name!r} but got {op!r}.")
+        return Predicate(name, op, self.value())
+
+    def value(self):
+        kind, value = self.peek()
+        if kind == "number":
+            self.position += 1
+            return float(value) if "." in value else int(value)
+        if kind == "string":
+            self.position += 1
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind == "keyword" and value in ("true", "false", "null"):
+            self.position += 1
+            return {"true": True, "false": False, "null": None}[value]
+        raise QueryError(f"Expected a value but got {value!r}.")
+
+
+def parse(text: str):
+    """Parses a query into a tree of `Predicate`, `And`, `Or` and `Not`.
+
+    A query combines comparisons with `and`, `or`, `not` and parentheses. A
+    comparison is `<field> <op> <value>` with op one of `= != > >= < <=`, or
+    `<field> in (<value>, ...)`, `<field> between <low> and <high>`,
+    `<field> contains <value>` or `<field> exists`. Values are numbers, quoted
+    strings, true, false or null.
+
+    Fields are the names in `FIELDS` and `DERIVED`, or any key of the search
+    results, with dots to reach nested keys. E.g.
+    `duration > 60000 and outcome in ("transfer", "hangup") and hour between 9 and 17`
+
+    Raises:
+        QueryError: If the query is not valid
+    """
+    return _Parser(text).parse()
+
+
+def _to_datetime(value) -> datetime | None:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    if isinstance(value, str):
+        if value.isdigit():
+            return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _getter(name: str):
+    """Returns a function reading a field from a dialog, None when it is missing."""
+    if name in DERIVED:
+        start, derive = _getter("start"), DERIVED[name]
+
+        def get(dialog):
+            dt = _to_datetime(start(dialog))
+            return derive(dt) if dt else None
+
+        return get
+
+    keys = FIELDS.get(name)
+    if keys:
+
+        def get(dialog):
+            for key in keys:
+                if dialog.get(key) is not None:
+                    return dialog[key]
+            return None
+
+        return get
+
+    path = name.split(".")
+
+    def get(dialog):
+        value = dialog
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return get
+
+
+def _normalise(value):
+    """Makes values comparable: strings compare case-insensitively and numeric strings as numbers."""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value.casefold()
+    return value
+
+
+def _test(op: str, expected):
+    """Returns a function testing one (non-list) value against a comparison."""
+    if op == "in":
+        options = {_normalise(v) for v in expected}
+        return lambda v: _normalise(v) in options
+    if op == "between":
+        low, high = _normalise(expected[0]), _normalise(expected[1])
+        return lambda v: _safe(lambda: low <= _normalise(v) <= high)
+    if op == "contains":
+        needle = str(expected).casefold()
+        return lambda v: isinstance(v, str) and needle in v.casefold()
+    expected = _normalise(expected)
+    compare = {
+        "=": lambda v: v == expected,
+        "!=": lambda v: v != expected,
+        ">": lambda v: v > expected,
+        ">=": lambda v: v >= expected,
+        "<": lambda v: v < expected,
+        "<=": lambda v: v <= expected,
+    }[op]
+    return lambda v: _safe(lambda: compare(_normalise(v)))
+
+
+def _safe(check) -> bool:
+    # Values of different types (e.g. a string and a number) never match
+    try:
+        return bool(check())
+    except TypeError:
+        return False
+
+
+def compile_query(node):
+    """Compiles a query tree into a function telling whether a dialog matches it.
+
+    A missing field matches nothing but `!=` and `not`. A field holding a list
+    (e.g. the intents of a dialog) matches when any of its items does.
+    """
+    if isinstance(node, And):
+        checks = [compile_query(t) for t in node.terms]
+        return lambda dialog: all(check(dialog) for check in checks)
+    if isinstance(node, Or):
+        checks = [compile_query(t) for t in node.terms]
+        return lambda dialog: any(check(dialog) for check in checks)
+    if isinstance(node, Not):
+        check = compile_query(node.term)
+        return lambda dialog: not check(dialog)
+
+    get = _getter(node.field)
+    if node.op == "exists":
+        return lambda dialog: get(dialog) is not None
+    test = _test(node.op, node.value)
+    negated = node.op == "!="
+
+    def check(dialog):
+        value = get(dialog)
+        if value is None:
+            return negated and node.value is not None
+        if isinstance(value, list):
+            if negated:
+                return all(test(v) for v in value)
+            return any(test(v) for v in value)
+        return test(value)
+
+    return check
+
+
+@dataclass
+class QueryPlan:
+    """How a query is run: the filters the search API applies, and the rest applied to its results."""
+
+    filters: dict = field(default_factory=dict)
+    residual: object = None
+
+    def matches(self, dialog: dict) -> bool:
+        return self._check(dialog)
+
+    def __post_init__(self):
+        self._check = compile_query(self.residual) if self.residual is not None else (lambda d: True)
+
+
+def _push_down(term, filters: dict) -> bool:
+    """Moves a predicate into the search filters if the search API supports it exactly."""
+    if not isinstance(term, Predicate):
+        return False
+    name, op, value = term.field, term.op, term.value
+    if name in ("ani", "ocp_group_name") and op in ("=", "in"):
+        key = "ani" if name == "ani" else "ocp_group_names"
+        values = list(value) if op == "in" else [value]
+        if key in filters or not all(isinstance(v, str) for v in values):
+            return False
+        filters[key] = values
+        return True
+    if name in ("region", "dialog_group") and op == "=" and isinstance(value, str):
+        if name in filters:
+            return False
+        filters[name] = value
+        return True
+    if name == "steps" and op in (">", ">=") and isinstance(value, int) and not isinstance(value, bool):
+        steps_gt = value if op == ">" else value - 1
+        if "steps_gt" in filters or steps_gt < 1:
+            return False
+        filters["steps_gt"] = steps_gt
+        return True
+    return False
+
+
+def plan_query(text: str) -> QueryPlan:
+    """Parses a query and splits it into search filters and a residual filter.
+
+    Only the predicates joined to the rest of the query by `and` can be pushed
+    down to the search API, which supports equality on ani, region, dialog_group
+    and ocp_group_name and a lower bound on steps.
+
+    Raises:
+        QueryError: If the query is not valid
+    """
+    node = parse(text)
+    terms = node.terms if isinstance(node, And) else (node,)
+    filters = {}
+    residual = tuple(t for t in terms if not _push_down(t, filters))
+    if not residual:
+        return QueryPlan(filters)
+    return QueryPlan(filters, residual[0] if len(residual) == 1 else And(residual))
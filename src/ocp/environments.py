@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+DEFAULT_ENVIRONMENT = "default"
+
+# The analytics stack is served under a different domain in specific environments
+ANALYTICS_HOSTS = {
+    "https://us1-m.ocp.ai": "https://us1-a.ocp.ai",
+    "https://eu1-m.ocp.ai": "https://eu1-a.ocp.ai",
+}
+
+
+@dataclass(frozen=True)
+class Environment:
+    """An OCP environment (region or tenant) and the credentials used to access it."""
+
+    name: str
+    host: str
+    analytics_host: str | None = None
+    username: str | None = None
+    password: str | None = None
+
+    def get_analytics_host(self) -> str:
+        """Returns the host serving the analytics stack of this environment."""
+        return self.analytics_host or ANALYTICS_HOSTS.get(self.host, self.host)
+
+
+_environments = None
+_clients = {}
+_lock = threading.Lock()
+
+
+def load_environments() -> dict:
+    """Reads the environment registry.
+
+    The environment configured by `OCP_HOST`, `OCP_USERNAME` and `OCP_PASSWORD` is
+    always available as "default". More environments are read from the JSON file
+    named by `OCP_ENVIRONMENTS_FILE`, mapping each name to its `host`,
+    `analytics_host`, `username` and `password`, and from `OCP_ENVIRONMENTS`, a
+    comma separated list of names each configured by `OCP_<NAME>_HOST`,
+    `OCP_<NAME>_ANALYTICS_HOST`, `OCP_<NAME>_USERNAME` and `OCP_<NAME>_PASSWORD`.
+    Missing credentials fall back to those of the default environment.
+
+    Returns:
+        dict: The environments keyed by name
+    """
+    username = os.getenv("OCP_USERNAME")
+    password = os.getenv("OCP_PASSWORD")
+    environments = {
+        DEFAULT_ENVIRONMENT: Environment(
+            DEFAULT_ENVIRONMENT, os.getenv("OCP_HOST"), None, username, password
+        )
+    }
+
+    path = os.getenv("OCP_ENVIRONMENTS_FILE")
+    if path:
+        with open(os.path.expanduser(path)) as f:
+            for name, config in json.load(f).items():
+                environments[name] = Environment(
+                    name=name,
+                    host=config["host"].rstrip("/"),
+                    analytics_host=config.get("analytics_host"),
+                    username=config.get("username", username),
+                    password=config.get("password", password),
+                )
+
+    for name in filter(None, (n.strip() for n in os.getenv("OCP_ENVIRONMENTS", "").split(","))):
+        prefix = f"OCP_{name.upper().replace('-', '_')}_"
+        host = os.getenv(prefix + "HOST")
+        if not host:
+            raise ValueError(f"Environment '{name}' has no {prefix}HOST set.")
+        environments[name] = Environment(
+            name=name,
+            host=host.rstrip("/"),
+            analytics_host=os.getenv(prefix + "ANALYTICS_HOST"),
+            username=os.getenv(prefix + "USERNAME", username),
+            password=os.getenv(prefix + "PASSWORD", password),
+        )
+
+    return environments
+
+
+def get_environments() -> dict:
+    """Returns the environment registry, reading it on first use."""
+    global _environments
+    with _lock:
+        if _environments is None:
+            _environments = load_environments()
+        return _environments
+
+
+def get_environment(name: str | None = None) -> Environment:
+    """Returns an environment by name, or the default one."""
+    environments = get_environments()
+    name = name or DEFAULT_ENVIRONMENT
+    if name not in environments:
+        raise ValueError(
+            f"Unknown environment '{name}'. Must be one of: {', '.join(environments)}"
+        )
+    return environments[name]
+
+
+def get_client(client_class, environment: str | None = None):
+    """Returns the pooled client of a class for an environment.
+
+    Clients are created once per environment and reused, so that their tokens and
+    connections are shared by every tool call.
+    """
+    env = get_environment(environment)
+    key = (client_class, env.name)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = client_class(environment=env)
+        return _clients[key]
+
+
+def fan_out(fetch, environments: list, max_workers: int = 8) -> dict:
+    """Calls `fetch(environment_name)` for every environment concurrently.
+
+    Returns:
+        dict: The result of each environment, or the exception it raised, keyed by name
+    """
+    for name in environments:
+        get_environment(name)
+
+    def call(name):
+        try:
+            return fetch(name)
+        except Exception as e:
+            return e
+
+    environments = list(dict.fromkeys(environments))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(environments, pool.map(call, environments)))
+
+
+def merge_tagged(results: dict) -> list:
+    """Merges the results of `fan_out` into one list, tagging each entry with its environment.
+
+    List results (e.g. dialogs) are merged item by item. Any other result (e.g. a
+    page of apps with its totals) is kept whole under `result`. Failed
+    environments are reported with an `error`.
+    """
+    merged = []
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            merged.append({"environment": name, "error": str(result)})
+        elif isinstance(result, list):
+            for item in result:
+                if isinstance(item, dict):
+                    merged.append({**item, "environment": name})
+                else:
+                    merged.append({"environment": name, "value": item})
+        else:
+            merged.append({"environment": name, "result": result})
+    return merged
@@ -11,4 +11,10 @@ class EnvironmentsManagerClient(BaseClient):
     def get_collection_variables(self, collection_id: str) -> dict:
         """Get a list of all variables in a collection."""
         endpoint = f"envs-manager/api/v1/variables-collections/{collection_id}"
-        return self.get(endpoint)
\ No newline at end of file
+        return self.get(endpoint)
+
+    def update_collection_variables(self, collection_id: str, variables: list) -> dict:
+        """Create or update variables in a collection, matched by key. Variables not
+        listed are left as they are."""
+        endpoint = f"envs-manager/api/v1/variables-collections/{collection_id}/variables"
+        return self.put(endpoint, json=variables)
@@ -1,17 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import threading
 import requests
 
+from . import transport
 from .base import BaseClient
+from .dialog_logs import is_dialog_closed
+from .dialog_query import plan_query
+from .environments import ANALYTICS_HOSTS
+from .log_cache import DialogLogCache
+from .models import Dialog, loads
+
+_log_cache = None
+_log_cache_lock = threading.Lock()
+
+
+def default_log_cache() -> DialogLogCache | None:
+    """Returns the process-wide dialog log cache, if one is configured."""
+    global _log_cache
+    with _log_cache_lock:
+        if _log_cache is None:
+            _log_cache = DialogLogCache.from_env() or False
+    return _log_cache or None
 
 
 class InsightsClient(BaseClient):
-    def __init__(self):
-        super().__init__()
-        url_mapping = {  # The analytics stack is served under a different domain in specific environments
-            "https://us1-m.ocp.ai": "https://us1-a.ocp.ai",
-            "https://eu1-m.ocp.ai": "https://eu1-a.ocp.ai",
-        }
-        self.base_url = url_mapping.get(self.base_url, self.base_url)
+    def __init__(self, environment=None, log_cache: DialogLogCache | bool | None = None):
+        """
+        Args:
+            environment (Environment, optional): The environment to connect to. Defaults to the one set by `OCP_HOST`
+            log_cache (DialogLogCache, optional): Cache for the logs of finished dialogs. Defaults to the one
+                configured by `OCP_LOG_CACHE_DIR`; pass False to disable caching.
+        """
+        super().__init__(environment)
+        if log_cache is None:
+            log_cache = default_log_cache()
+        self.log_cache = log_cache or None
+        if environment is not None:
+            self.base_url = environment.get_analytics_host()
+        else:
+            self.base_url = ANALYTICS_HOSTS.get(self.base_url, self.base_url)
 
     def get_dialog_log(self, dialog_id: str) -> str:
         """Gets the dialog log for a specific dialog ID.
@@ -22,13 +50,80 @@ class InsightsClient(BaseClient):
         Returns:
             dict: The dialog log data
         """
+        # Logs of finished dialogs never change, so they can be cached for good
+        if self.log_cache is not None:
+            cached = self.log_cache.get(dialog_id)
+            if cached is not None:
+                return cached
+
         endpoint = f"dialogs-api/insights/v2/dialogs/{dialog_id}/log"
         headers = self._get_auth_headers()
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=headers)
+        self.rate_limiter.acquire()
+        response = transport.get(url, headers=headers)
+        response.raise_for_status()
 
+        if self.log_cache is not None and is_dialog_closed(response.text):
+            self.log_cache.put(dialog_id, response.text)
         return response.text
 
+    def get_dialog_logs(self, dialog_ids: list, max_workers: int = 8) -> dict:
+        """Gets the dialog logs for many dialogs concurrently.
+
+        Args:
+            dialog_ids (list): The IDs of the dialogs to retrieve logs for
+            max_workers (int, optional): Number of logs fetched in parallel. Defaults to 8
+
+        Returns:
+            dict: The raw dialog log of each dialog, keyed by dialog ID. Dialogs whose
+                log could not be retrieved are left out.
+        """
+        dialog_ids = list(dict.fromkeys(dialog_ids))
+        logs = dict(self.iter_dialog_logs(dialog_ids, max_workers=max_workers))
+        return {i: logs[i] for i in dialog_ids if i in logs}
+
+    def iter_dialog_logs(
+        self,
+        dialog_ids: list,
+        max_workers: int = 8,
+        cancelled: threading.Event | None = None,
+    ):
+        """Gets the dialog logs for many dialogs concurrently, yielding each one as it arrives.
+
+        Args:
+            dialog_ids (list): The IDs of the dialogs to retrieve logs for
+            max_workers (int, optional): Number of logs fetched in parallel. Defaults to 8
+            cancelled (threading.Event, optional): Once set, no further log is requested
+
+        Yields:
+            tuple: The dialog ID and its raw log, in completion order. Dialogs whose
+                log could not be retrieved are left out.
+        """
+        dialog_ids = list(dict.fromkeys(dialog_ids))
+        if not dialog_ids:
+            return
+        cancelled = cancelled or threading.Event()
+
+        def fetch(dialog_id):
+            if cancelled.is_set():
+                return None
+            try:
+                return self.get_dialog_log(dialog_id)
+            except requests.exceptions.RequestException:
+                return None
+
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {pool.submit(fetch, i): i for i in dialog_ids}
+            for future in as_completed(futures):
+                if cancelled.is_set():
+                    return
+                log = future.result()
+                if log is not None:
+                    yield futures[future], log
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def search_dialogs(
         self,
         apps: list,
@@ -60,11 +155,148 @@ class InsightsClient(BaseClient):
         Returns:
             dict: Search results containing matching dialogs
         """
-        endpoint = "dialogs-api/insights/v2/dialogs/search"
+        payload = self._search_payload(
+            apps,
+            self._convert_to_ms(from_date),
+            self._convert_to_ms(to_date),
+            size,
+            ani=ani,
+            dialog_group=dialog_group,
+            ocp_group_names=ocp_group_names,
+            region=region,
+            application_layer=application_layer,
+            steps_gt=steps_gt,
+        )
+        response = self.post("dialogs-api/insights/v2/dialogs/search", json=payload)
+        return response.get("dialogs", {})
+
+    def search_dialog_models(
+        self, apps: list, from_date: str, to_date: str, size: int = 10, **filters
+    ) -> list[Dialog]:
+        """Search dialogs like `search_dialogs`, returning them as typed models decoded
+        straight from the response body.
+        """
+        payload = self._search_payload(
+            apps, self._convert_to_ms(from_date), self._convert_to_ms(to_date), size, **filters
+        )
+        content = self.post_content("dialogs-api/insights/v2/dialogs/search", json=payload)
+        return [Dialog.from_dict(d) for d in loads(content).get("dialogs") or []]
+
+    def iter_dialog_slices(
+        self,
+        apps: list,
+        from_date: str,
+        to_date: str,
+        size: int = 10,
+        slices: int | None = None,
+        cancelled: threading.Event | None = None,
+        **filters,
+    ):
+        """Searches dialogs one time slice at a time, yielding the dialogs of each slice as it arrives.
+
+        The window is cut into equal slices searched from the newest to the oldest,
+        so the dialogs come in the same order as with `search_dialogs` and the
+        search stops as soon as `size` dialogs were found.
 
-        from_ms = self._convert_to_ms(from_date)
-        to_ms = self._convert_to_ms(to_date)
-        # Build search payload from parameters
+        Args:
+            apps (list): List of app IDs to filter by
+            from_date (str): Start date/time in ISO format or milliseconds timestamp
+            to_date (str): End date/time in ISO format or milliseconds timestamp
+            size (int, optional): Number of results to return. Defaults to 10
+            slices (int, optional): Number of slices. Defaults to one per 100 dialogs, at most 24
+            cancelled (threading.Event, optional): Once set, no further slice is requested
+            **filters: The other filters of `search_dialogs`
+
+        Yields:
+            list: The dialogs found in each slice
+        """
+        from_ms = int(self._convert_to_ms(from_date))
+        to_ms = int(self._convert_to_ms(to_date))
+        if slices is None:
+            slices = min(24, max(1, -(-size // 100)))
+        step = max(1, -(-(to_ms - from_ms) // slices))
+
+        remaining = size
+        end = to_ms
+        seen = set()
+        while remaining > 0 and end > from_ms:
+            if cancelled is not None and cancelled.is_set():
+                return
+            start = max(from_ms, end - step)
+            payload = self._search_payload(apps, str(start), str(end), remaining, **filters)
+            dialogs = self.post("dialogs-api/insights/v2/dialogs/search", json=payload)
+            # A dialog on the boundary of two slices is only reported once
+            dialogs = [
+                d for d in dialogs.get("dialogs") or []
+                if dialog_id(d) is None or dialog_id(d) not in seen
+            ]
+            dialogs = dialogs[:remaining]
+            seen.update(dialog_id(d) for d in dialogs)
+            remaining -= len(dialogs)
+            end = start
+            yield dialogs
+
+    def query_dialogs(
+        self,
+        apps: list,
+        query: str,
+        from_date: str,
+        to_date: str,
+        size: int = 10,
+        max_scanned: int = 1000,
+        cancelled: threading.Event | None = None,
+    ):
+        """Searches the dialogs matching a query, yielding the matches of each time slice as it arrives.
+
+        The predicates of the query the search API supports are sent with the
+        search, and the rest is applied to the dialogs it returns. See
+        `dialog_query.parse` for the query language.
+
+        Args:
+            apps (list): List of app IDs to filter by
+            query (str): The query dialogs must match
+            from_date (str): Start date/time in ISO format or milliseconds timestamp
+            to_date (str): End date/time in ISO format or milliseconds timestamp
+            size (int, optional): Number of matches to return. Defaults to 10
+            max_scanned (int, optional): Most dialogs to search through. Defaults to 1000
+            cancelled (threading.Event, optional): Once set, no further slice is requested
+
+        Yields:
+            tuple: The matches of each slice and the number of dialogs searched so far
+
+        Raises:
+            QueryError: If the query is not valid
+        """
+        plan = plan_query(query)
+        found = scanned = 0
+        slices = self.iter_dialog_slices(
+            apps, from_date, to_date, max_scanned, cancelled=cancelled, **plan.filters
+        )
+        try:
+            for dialogs in slices:
+                scanned += len(dialogs)
+                matches = [d for d in dialogs if plan.matches(d)][: size - found]
+                found += len(matches)
+                yield matches, scanned
+                if found >= size:
+                    return
+        finally:
+            slices.close()
+
+    def _search_payload(
+        self,
+        apps: list,
+        from_ms: str,
+        to_ms: str,
+        size: int,
+        ani: list = None,
+        dialog_group: str = None,
+        ocp_group_names: list = None,
+        region: str = None,
+        application_layer: bool = True,
+        steps_gt: int = None,
+    ) -> dict:
+        """Builds the payload of a dialog search."""
         payload = {
             "apps": apps,
             "from_ms": from_ms,
@@ -72,7 +304,8 @@ class InsightsClient(BaseClient):
             "size": size,
             "query_params": {
                 "application_layer": application_layer,
-                "ocp_group_names": [apps[0].split(".")[-1]],
+                # The group name of an app is the last part of its ID
+                "ocp_group_names": list(dict.fromkeys(app.split(".")[-1] for app in apps)),
             },
             "order": "desc",
         }
@@ -88,9 +321,7 @@ class InsightsClient(BaseClient):
             payload["region"] = region
         if steps_gt:
             payload["stepsGt"] = steps_gt
-
-        response = self.post(endpoint, json=payload)
-        return response.get("dialogs", {})
+        return payload
 
     def _convert_to_ms(self, timestamp):
         """Convert ISO datetime string to milliseconds timestamp.
@@ -105,3 +336,8 @@ class InsightsClient(BaseClient):
             dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
             return str(int(dt.timestamp() * 1000))
         return timestamp
+
+
+def dialog_id(dialog: dict) -> str | None:
+    """Returns the ID of a dialog as found in the `search_dialogs` results."""
+    return dialog.get("dialog_id") or dialog.get("dialogId") or dialog.get("id")
@@ -0,0 +1,162 @@
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .dialog_logs import parse_steps
+
+
+class LatencyHistogram:
+    """A mergeable log-bucketed latency histogram.
+
+    Samples are counted in buckets whose bounds grow geometrically, so memory
+    stays constant no matter how many samples are recorded and the reported
+    percentiles are within `precision` of the real value.
+    """
+
+    def __init__(self, precision: float = 0.02):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float):
+        """Records a single latency sample, in milliseconds."""
+        value_ms = max(float(value_ms), 0.0)
+        self.buckets[self._bucket(value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Adds the samples of another histogram with the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge histograms with different precision.")
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """Returns the approximate latency at percentile `p` (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._value(bucket), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Returns the sample count, mean, p50/p95/p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(self.max, 1),
+        }
+
+    def _bucket(self, value_ms: float) -> int:
+        # Everything under a millisecond shares bucket 0
+        if value_ms < 1:
+            return 0
+        return int(math.log(value_ms) / self._log_base) + 1
+
+    def _value(self, bucket: int) -> float:
+        # Upper bound of the bucket
+        if bucket == 0:
+            return 1.0
+        return math.exp(bucket * self._log_base)
+
+
+class LatencyProfile:
+    """Per-state and per-integration latency histograms over a set of dialogs."""
+
+    def __init__(self):
+        self.dialogs = 0
+        self.states: dict[str, LatencyHistogram] = {}
+        self.integrations: dict[str, LatencyHistogram] = {}
+
+    def add_log(self, log_text: str):
+        """Parses a raw dialog log and records the timings of its steps."""
+        self.dialogs += 1
+        for step in parse_steps(log_text):
+            if step.duration_ms is None:
+                continue
+            self.states.setdefault(step.state, LatencyHistogram()).record(
+                step.duration_ms
+            )
+            if step.integration:
+                self.integrations.setdefault(
+                    step.integration, LatencyHistogram()
+                ).record(step.duration_ms)
+
+    def merge(self, other: "LatencyProfile"):
+        """Adds the histograms of another profile to this one."""
+        self.dialogs += other.dialogs
+        for target, source in (
+            (self.states, other.states),
+            (self.integrations, other.integrations),
+        ):
+            for name, histogram in source.items():
+                target.setdefault(name, LatencyHistogram()).merge(histogram)
+
+    def slowest_states(self, top: int = 10, percentile: float = 95) -> list[dict]:
+        """Returns the `top` states ranked by their latency at `percentile`."""
+        return self._ranked(self.states, "state", top, percentile)
+
+    def slowest_integrations(self, top: int = 10, percentile: float = 95) -> list[dict]:
+        """Returns the `top` integrations ranked by their latency at `percentile`."""
+        return self._ranked(self.integrations, "integration", top, percentile)
+
+    @staticmethod
+    def _ranked(histograms: dict, label: str, top: int, percentile: float) -> list[dict]:
+        ranked = sorted(
+            histograms.items(),
+            key=lambda item: item[1].percentile(percentile),
+            reverse=True,
+        )
+        return [{label: name, **histogram.summary()} for name, histogram in ranked[:top]]
+
+
+def _profile_chunk(log_texts: list[str]) -> LatencyProfile:
+    profile = LatencyProfile()
+    for log_text in log_texts:
+        profile.add_log(log_text)
+    return profile
+
+
+def profile_logs(
+    log_texts: list[str], processes: int | None = None, chunk_size: int = 50
+) -> LatencyProfile:
+    """Builds a latency profile from many raw dialog logs.
+
+    Parsing is CPU bound, so the logs are split in chunks that are parsed on a
+    process pool and the partial profiles are merged. Small batches are parsed
+    in-process, where starting the pool would cost more than it saves.
+
+    Args:
+        log_texts (list[str]): Raw dialog logs, as returned by `get_dialog_log`
+        processes (int, optional): Size of the process pool. Defaults to the CPU count.
+            Use 0 to parse in the calling process.
+        chunk_size (int, optional): Number of logs handed to a worker at a time. Defaults to 50
+
+    Returns:
+        LatencyProfile: The merged profile
+    """
+    chunks = [
+        log_texts[i : i + chunk_size] for i in range(0, len(log_texts), chunk_size)
+    ]
+    if processes == 0 or len(chunks) <= 1:
+        return _profile_chunk(log_texts)
+
+    profile = LatencyProfile()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for partial in pool.map(_profile_chunk, chunks):
+            profile.merge(partial)
+    return profile
@@ -0,0 +1,153 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+
+class DialogLogCache:
+    """A size-bounded on-disk cache of dialog logs, keyed by dialog ID.
+
+    Logs are stored zlib-compressed, one file per dialog, and read back through a
+    memory map. The least recently used logs are evicted once the compressed size
+    of the cache exceeds `max_bytes`. Writes go through a temporary file and an
+    atomic rename, so several processes can share the same directory. Recency is
+    kept in the files' modification times and the directory is rescanned every
+    `rescan_every` writes, so the budget also counts what other processes wrote;
+    between rescans it can be overshot by their most recent writes.
+
+    Writing to the cache is best effort: a full disk or a read-only directory
+    leaves the log uncached instead of failing the read that fetched it.
+    """
+
+    SUFFIX = ".log.z"
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        rescan_every: int = 64,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_every = rescan_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._size = 0
+        self._writes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_env(cls):
+        """Creates the cache configured by `OCP_LOG_CACHE_DIR`, or None if it is not set."""
+        directory = os.getenv("OCP_LOG_CACHE_DIR")
+        if not directory:
+            return None
+        max_mb = int(os.getenv("OCP_LOG_CACHE_MAX_MB", "256"))
+        return cls(os.path.expanduser(directory), max_bytes=max_mb * 1024 * 1024)
+
+    def get(self, dialog_id: str) -> str | None:
+        """Returns the cached log of a dialog, or None if it is not cached."""
+        name = self._name(dialog_id)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                log_text = zlib.decompress(mapped).decode("utf-8")
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            # Missing, evicted by another process, or truncated
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            else:
+                self._remember(name, os.path.getsize(path))
+            self.hits += 1
+        return log_text
+
+    def put(self, dialog_id: str, log_text: str):
+        """Stores the log of a finished dialog."""
+        data = zlib.compress(log_text.encode("utf-8"), 6)
+        if len(data) > self.max_bytes:
+            return
+
+        name = self._name(dialog_id)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._forget(name)
+            self._remember(name, len(data))
+            self._writes += 1
+            if self._writes % self.rescan_every == 0:
+                self._load_index()
+            self._evict()
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counts and the current size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _load_index(self):
+        self._entries.clear()
+        self._size = 0
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                # Evicted by another process in the meantime
+                continue
+            files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._remember(name, size)
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _remember(self, name: str, size: int):
+        self._entries[name] = size
+        self._size += size
+
+    def _forget(self, name: str):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    def _name(self, dialog_id: str) -> str:
+        # Hash the ID so that any dialog ID makes a safe file name
+        return hashlib.sha256(dialog_id.encode("utf-8")).hexdigest()[:40] + self.SUFFIX
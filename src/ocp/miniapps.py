@@ -1,58 +1,69 @@
+import os
+
 from .base import BaseClient
-import json
+from .models import App, items, loads
+from .multipart import json_file_upload
 
 
 class MiniAppsClient(BaseClient):
-    def __init__(self):
-        super().__init__()
-        self._active_version = None
-
     def get_apps(self, page_size=10, search_term=None):
         """Gets a list of applications."""
         endpoint = "miniapps/api/apps"
         params = {"pageSize": page_size, "searchTerm": search_term}
         return self.get(endpoint, params=params)
 
+    def get_app_models(self, page_size=10, search_term=None):
+        """Gets a list of applications like `get_apps`, as typed models."""
+        endpoint = "miniapps/api/apps"
+        params = {"pageSize": page_size, "searchTerm": search_term}
+        return [App.from_dict(app) for app in items(loads(self.get_content(endpoint, params=params)))]
+
     def get_active_version(self):
         """Gets the active version from the config."""
         endpoint = "miniapps/api/config"
         response = self.get(endpoint)
         return response.get("config", {}).get("activeVersion")
 
-    def get_miniapp(self, miniapp_id):
+    def get_miniapp(self, miniapp_id, version=None):
         """Gets a specific miniapp by ID using the active version.
 
         Args:
             miniapp_id (str): The ID of the miniapp to retrieve
+            version (str, optional): The version to read from. Defaults to the active version,
+                looked up on every call since it can change while the server runs.
 
         Returns:
             dict: The miniapp data
         """
-        if not self._active_version:
-            self._active_version = self.get_active_version()
-
-        endpoint = f"miniapps/api/apps/{self._active_version}/{miniapp_id}"
+        version = version or self.get_active_version()
+        endpoint = f"miniapps/api/apps/{version}/{miniapp_id}"
         return self.get(endpoint)
 
-    def update_miniapp(self, miniapp_id, miniapp_json):
+    def update_miniapp(self, miniapp_id, miniapp_json, version=None, compress=None):
         """Updates a specific miniapp by ID using the active version.
 
+        The model is encoded while it is uploaded, so large models are not copied
+        into memory as a whole.
+
         Args:
             miniapp_id (str): The ID of the miniapp to update
             miniapp_json (dict): The miniapp data to update with
+            version (str, optional): The version to write to. Defaults to the active version.
+                Pass the version the miniapp was read from to write back to the same one.
+            compress (bool, optional): Whether to gzip the upload. Defaults to `OCP_UPLOAD_GZIP`,
+                for deployments whose endpoint accepts compressed requests.
 
         Returns:
             dict: The updated miniapp data
         """
-        if not self._active_version:
-            self._active_version = self.get_active_version()
-
-        endpoint = f"miniapps/api/apps/{self._active_version}/{miniapp_id}"
+        version = version or self.get_active_version()
+        endpoint = f"miniapps/api/apps/{version}/{miniapp_id}"
         payload = miniapp_json.get("model") if "model" in miniapp_json else miniapp_json
+        if compress is None:
+            compress = bool(os.environ.get("OCP_UPLOAD_GZIP"))
 
-        # Create form-data with JSON file
-        files = {
-            "file": (f"{miniapp_id}.json", json.dumps(payload), "application/json")
-        }
-
-        return self.put(endpoint, files=files)
+        # Stream form-data with a JSON file
+        headers, body = json_file_upload(
+            "file", f"{miniapp_id}.json", payload, compress=compress
+        )
+        return self.put(endpoint, data=body, headers=headers)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+from dataclasses import dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str):
+    """Decodes JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value) -> bytes:
+    """Encodes compact JSON with sorted keys, so that equal documents give equal bytes."""
+    if orjson is not None:
+        # orjson leaves its output in an oversized buffer; copy it out to keep it small
+        return memoryview(orjson.dumps(value, option=orjson.OPT_SORT_KEYS)).tobytes()
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def _first(doc: dict, *keys):
+    for key in keys:
+        if doc.get(key) is not None:
+            return doc[key]
+    return None
+
+
+@dataclass(slots=True)
+class Node:
+    """A node of an Orchestrator canvas.
+
+    Only the fields needed to walk the graph are decoded. The rest of the node is
+    kept as compact JSON bytes and decoded by `data` when it is accessed.
+    """
+
+    id: str
+    type: str | None
+    name: str | None
+    raw: bytes
+
+    @property
+    def data(self) -> dict:
+        """The whole node document."""
+        return loads(self.raw)
+
+    @property
+    def digest(self) -> str:
+        """A hash of the node's content."""
+        return hashlib.blake2b(self.raw, digest_size=8).hexdigest()
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "Node":
+        data = doc.get("data") if isinstance(doc.get("data"), dict) else {}
+        return cls(
+            id=str(doc.get("id")),
+            type=_first(doc, "type", "nodeType"),
+            name=_first(doc, "name", "label") or _first(data, "name", "label"),
+            raw=dumps(doc),
+        )
+
+
+@dataclass(slots=True)
+class Edge:
+    """An edge of an Orchestrator canvas, linking an output of a node to another node."""
+
+    id: str
+    source: str
+    target: str
+    source_handle: str | None
+    target_handle: str | None
+    raw: bytes
+
+    @property
+    def data(self) -> dict:
+        """The whole edge document."""
+        return loads(self.raw)
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "Edge":
+        source = str(_first(doc, "source", "from"))
+        target = str(_first(doc, "target", "to"))
+        source_handle = _first(doc, "sourceHandle", "source_handle")
+        target_handle = _first(doc, "targetHandle", "target_handle")
+        # Edges without an ID are identified by what they connect
+        edge_id = doc.get("id") or f"{source}:{source_handle or ''}->{target}:{target_handle or ''}"
+        return cls(str(edge_id), source, target, source_handle, target_handle, dumps(doc))
+
+
+@dataclass(slots=True)
+class Canvas:
+    """An Orchestrator canvas: its nodes and edges, and the rest of it as compact JSON bytes."""
+
+    id: str
+    name: str | None
+    nodes: list
+    edges: list
+    raw: bytes
+
+    @property
+    def data(self) -> dict:
+        """The canvas document without its nodes and edges."""
+        return loads(self.raw)
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "Canvas":
+        # The graph is either at the top of the canvas or in one of its sub-documents
+        key = next(
+            (k for k in ("canvas", "graph", "flow", "data")
+             if isinstance(doc.get(k), dict) and "nodes" in doc[k]),
+            None,
+        )
+        graph = doc[key] if key else doc
+        rest = {k: v for k, v in graph.items() if k not in ("nodes", "edges", "links")}
+        if key:
+            rest = {**doc, key: rest}
+        return cls(
+            id=str(_first(doc, "id", "canvas_id", "canvasId")),
+            name=_first(doc, "name", "title"),
+            nodes=[Node.from_dict(n) for n in graph.get("nodes") or []],
+            edges=[Edge.from_dict(e) for e in graph.get("edges") or graph.get("links") or []],
+            raw=dumps(rest),
+        )
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "Canvas":
+        return cls.from_dict(loads(content))
+
+
+@dataclass(slots=True)
+class Dialog:
+    """A dialog found by a dialog search. The rest of the search hit is kept as compact JSON bytes."""
+
+    id: str | None
+    app: str | None
+    steps: int | None
+    duration_ms: float | None
+    raw: bytes
+
+    @property
+    def data(self) -> dict:
+        """The whole search hit."""
+        return loads(self.raw)
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "Dialog":
+        steps = _first(doc, "steps", "steps_count", "stepsCount")
+        duration = _first(doc, "duration_ms", "durationMs", "duration")
+        return cls(
+            id=_first(doc, "dialog_id", "dialogId", "id"),
+            app=_first(doc, "app", "app_id", "appId"),
+            steps=steps if isinstance(steps, int) else None,
+            duration_ms=duration if isinstance(duration, (int, float)) else None,
+            raw=dumps(doc),
+        )
+
+
+@dataclass(slots=True)
+class App:
+    """A miniapp or an Orchestrator app, as listed by a search."""
+
+    id: str
+    name: str | None
+    raw: bytes
+
+    @property
+    def data(self) -> dict:
+        """The whole app document."""
+        return loads(self.raw)
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "App":
+        return cls(
+            id=str(_first(doc, "id", "app_id", "appId", "_id")),
+            name=_first(doc, "name", "title"),
+            raw=dumps(doc),
+        )
+
+
+def items(page) -> list:
+    """Returns the items of a listing, whether it is a list or a page wrapping one."""
+    if isinstance(page, list):
+        return page
+    if isinstance(page, dict):
+        for key in ("items", "results", "apps", "data", "dialogs"):
+            if isinstance(page.get(key), list):
+                return page[key]
+    return []
@@ -0,0 +1,93 @@
+import json
+import uuid
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json(value, depth: int = 2):
+    """Encodes a value as JSON piece by piece, giving the same text as `json.dumps`.
+
+    The outer `depth` levels of objects and arrays are walked in Python and
+    everything below is encoded by the C encoder, so no piece is larger than one
+    of the innermost values while encoding stays close to the speed of `json.dumps`.
+    """
+    if depth and isinstance(value, dict) and value:
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield ", "
+            # Keys that are not strings are converted like json.dumps does
+            yield json.dumps(key if isinstance(key, str) else json.dumps(key))
+            yield ": "
+            yield from iter_json(item, depth - 1)
+        yield "}"
+    elif depth and isinstance(value, (list, tuple)) and value:
+        yield "["
+        for i, item in enumerate(value):
+            if i:
+                yield ", "
+            yield from iter_json(item, depth - 1)
+        yield "]"
+    else:
+        yield json.dumps(value)
+
+
+def _chunks(pieces, chunk_size: int):
+    """Joins small text pieces into encoded chunks of about `chunk_size` bytes."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def json_file_upload(
+    field: str, filename: str, value, compress: bool = False, chunk_size: int = CHUNK_SIZE
+) -> tuple[dict, object]:
+    """Builds a multipart/form-data body holding one JSON file, as a stream of chunks.
+
+    The JSON is encoded while the body is sent, so the whole document never sits in
+    memory as text or bytes. The body is sent with chunked transfer encoding since
+    its length is not known in advance.
+
+    Args:
+        field (str): The name of the form field
+        filename (str): The name of the file
+        value: The JSON serialisable content of the file
+        compress (bool, optional): Gzip the body and set `Content-Encoding`, for endpoints accepting it
+        chunk_size (int, optional): Approximate size of the chunks in bytes
+
+    Returns:
+        tuple: The request headers and the body, to pass as `headers` and `data`
+    """
+    boundary = uuid.uuid4().hex
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+    def pieces():
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            "Content-Type: application/json\r\n\r\n"
+        )
+        yield from iter_json(value)
+        yield f"\r\n--{boundary}--\r\n"
+
+    body = _chunks(pieces(), chunk_size)
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip(body)
+    return headers, body
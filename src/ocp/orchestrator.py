@@ -1,4 +1,5 @@
 from .base import BaseClient
+from .models import App, Canvas, items, loads
 
 
 class OrchestratorClient(BaseClient):
@@ -26,4 +27,21 @@ class OrchestratorClient(BaseClient):
             canvas_id: The ID of the canvas to get
         """
         endpoint = f"orchestrator/api/canvases/{canvas_id}/"
-        return self.get(endpoint)
\ No newline at end of file
+        return self.get(endpoint)
+
+    def get_canvas_model(self, canvas_id: str) -> Canvas:
+        """Get a canvas by ID as a typed model, decoded straight from the response body.
+
+        Args:
+            canvas_id: The ID of the canvas to get
+        """
+        endpoint = f"orchestrator/api/canvases/{canvas_id}/"
+        return Canvas.from_bytes(self.get_content(endpoint))
+
+    def search_app_models(self, search_term: str | None = None, page_size: int = 30) -> list[App]:
+        """Search Orchestrator apps like `search_apps`, returning them as typed models."""
+        params = {"limit": page_size}
+        if search_term:
+            params['search_term'] = search_term
+        page = loads(self.get_content("orchestrator/api/apps/pagination/", params=params))
+        return [App.from_dict(app) for app in items(page)]
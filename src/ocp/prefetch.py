@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .dialog_logs import is_dialog_closed
+from .insights import dialog_id
+
+# Keys under which canvas nodes reference other resources
+MINIAPP_KEYS = ("miniapp_id", "miniappId", "miniAppId")
+COLLECTION_KEYS = ("collection_id", "collectionId", "variablesCollectionId", "variables_collection_id")
+
+
+class Prefetcher:
+    """Fetches the resources an agent is likely to ask for next, in the background.
+
+    Prefetches run on a small thread pool, through the clients and so within their
+    rate budget, and leave their results in the client caches. At most
+    `max_pending` prefetches wait at a time; more are dropped rather than queued.
+    A resource already prefetched, and not expired, is not fetched again.
+
+    `claim` is called whenever a tool is asked for a resource that could have been
+    prefetched, to track how often prefetching pays off.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, max_tracked: int = 4096):
+        self.max_tracked = max_tracked
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocp-prefetch")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._prefetched = OrderedDict()  # key -> expiry
+        self._in_flight = set()
+        self._stats = Counter()  # (kind, stat) -> count
+        self._lock = threading.Lock()
+
+    def prefetch(self, key: tuple, fetch, ttl: float) -> bool:
+        """Calls `fetch()` in the background to warm a cache for `ttl` seconds.
+
+        Args:
+            key (tuple): The kind of resource followed by what identifies it
+            fetch: The function fetching the resource into its cache. It may return False
+                when the resource turned out not to be cacheable
+            ttl (float): How long the cache keeps it
+
+        Returns:
+            bool: Whether the prefetch was started
+        """
+        kind = key[0]
+        with self._lock:
+            if key in self._in_flight or self._prefetched.get(key, 0) > time.time():
+                return False
+            if not self._slots.acquire(blocking=False):
+                self._stats[kind, "dropped"] += 1
+                return False
+            self._in_flight.add(key)
+            self._stats[kind, "started"] += 1
+
+        def run():
+            try:
+                outcome = "not_kept" if fetch() is False else "completed"
+            except Exception:
+                outcome = "failed"
+            with self._lock:
+                self._in_flight.discard(key)
+                self._stats[kind, outcome] += 1
+                if outcome == "completed":
+                    self._prefetched[key] = time.time() + ttl
+                    self._prefetched.move_to_end(key)
+                    while len(self._prefetched) > self.max_tracked:
+                        self._prefetched.popitem(last=False)
+            self._slots.release()
+
+        self._pool.submit(run)
+        return True
+
+    def claim(self, key: tuple) -> bool:
+        """Records that a tool asked for a resource. Returns whether it had been prefetched."""
+        kind = key[0]
+        with self._lock:
+            hit = self._prefetched.pop(key, 0) > time.time()
+            self._stats[kind, "hits" if hit else "misses"] += 1
+        return hit
+
+    def stats(self) -> dict:
+        """Returns the counts of each kind of prefetch, with the share of requests they served."""
+        with self._lock:
+            stats = dict(self._stats)
+        kinds = {}
+        for (kind, stat), count in sorted(stats.items()):
+            kinds.setdefault(kind, {})[stat] = count
+        for counts in kinds.values():
+            hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+            completed = counts.get("completed", 0)
+            # The share of requests served by a prefetch, and of prefetches that were used
+            counts["hit_rate"] = round(hits / (hits + misses), 3) if hits + misses else None
+            counts["used_rate"] = round(hits / completed, 3) if completed else None
+        return kinds
+
+
+def canvas_references(canvas) -> tuple[set, set]:
+    """Finds the miniapps and variable collections a canvas references.
+
+    Returns:
+        tuple: The IDs of the miniapps and of the variable collections
+    """
+    miniapps, collections = set(), set()
+    stack = [canvas]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in MINIAPP_KEYS and isinstance(item, str):
+                    miniapps.add(item)
+                elif key in COLLECTION_KEYS and isinstance(item, str):
+                    collections.add(item)
+                elif isinstance(item, (dict, list)):
+                    stack.append(item)
+        elif isinstance(value, list):
+            stack.extend(value)
+    return miniapps, collections
+
+
+def prefetch_canvas_references(
+    prefetcher: Prefetcher, canvas: dict, environment: str, miniapps_client, collections_client
+):
+    """Prefetches the miniapps and variable collections a canvas references into the response cache."""
+    # Without a response cache there is nowhere to keep them
+    if miniapps_client.cache is None:
+        return
+    miniapps, collections = canvas_references(canvas)
+    for miniapp_id in sorted(miniapps):
+        prefetcher.prefetch(
+            ("miniapp", environment, miniapp_id),
+            lambda i=miniapp_id: miniapps_client.get_miniapp(i),
+            miniapps_client.cache_ttl,
+        )
+    for collection_id in sorted(collections):
+        prefetcher.prefetch(
+            ("collection", environment, collection_id),
+            lambda i=collection_id: collections_client.get_collection_variables(i),
+            collections_client.cache_ttl,
+        )
+
+
+def prefetch_dialog_logs(
+    prefetcher: Prefetcher, dialogs: list, environment: str, insights_client, top: int
+):
+    """Prefetches the logs of the first dialogs of a search into the dialog log cache."""
+    # Only the logs of finished dialogs are kept, and they are kept for good
+    if insights_client.log_cache is None:
+        return
+    for dialog in dialogs[:top]:
+        i = dialog_id(dialog) if isinstance(dialog, dict) else None
+        if i:
+            prefetcher.prefetch(
+                ("dialog_log", environment, i),
+                lambda i=i: is_dialog_closed(insights_client.get_dialog_log(i)),
+                float("inf"),
+            )
+
+
+_prefetcher = None
+_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher | None:
+    """Returns the process-wide prefetcher if `OCP_PREFETCH` is set, or None.
+
+    `OCP_PREFETCH_WORKERS` sets the number of prefetches run at a time (2 by default).
+    """
+    global _prefetcher
+    with _lock:
+        if _prefetcher is None:
+            if os.environ.get("OCP_PREFETCH"):
+                workers = int(os.environ.get("OCP_PREFETCH_WORKERS") or 2)
+                _prefetcher = Prefetcher(max_workers=workers)
+            else:
+                _prefetcher = False
+    return _prefetcher or None
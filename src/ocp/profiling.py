@@ -0,0 +1,216 @@
+import functools
+import inspect
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class _Settings:
+    """What is profiled. Read on every tool call, so disabled profiling costs one attribute lookup."""
+
+    def __init__(self):
+        self.enabled = False
+        self.tools = None  # None for every tool
+        self.every = 1
+        self.memory = False
+        self.interval = 0.005
+        self.directory = os.path.join(tempfile.gettempdir(), "ocp-profiles")
+
+
+_settings = _Settings()
+_calls = Counter()
+_recent = deque(maxlen=20)
+_sequence = itertools.count(1)
+_tracing = 0
+_lock = threading.Lock()
+
+
+def configure(
+    tools: list | None = None,
+    every: int = 1,
+    memory: bool = False,
+    directory: str | None = None,
+    interval: float | None = None,
+):
+    """Turns profiling on.
+
+    Args:
+        tools (list, optional): Names of the tools to profile. Defaults to every tool
+        every (int, optional): Profile every Nth call of each tool. Defaults to 1, every call
+        memory (bool, optional): Also write a tracemalloc snapshot of each profiled call
+        directory (str, optional): Where profiles are written. Defaults to `ocp-profiles` in the temp directory
+        interval (float, optional): Seconds between stack samples. Defaults to 0.005
+    """
+    with _lock:
+        _settings.tools = frozenset(tools) if tools else None
+        _settings.every = max(1, int(every))
+        _settings.memory = memory
+        if directory:
+            _settings.directory = os.path.expanduser(directory)
+        if interval:
+            _settings.interval = interval
+        _calls.clear()
+        _settings.enabled = True
+
+
+def disable():
+    """Turns profiling off."""
+    _settings.enabled = False
+
+
+def configure_from_env():
+    """Turns profiling on if `OCP_PROFILE` is set.
+
+    `OCP_PROFILE` is a comma separated list of tool names, or `*` for every tool.
+    `OCP_PROFILE_EVERY` profiles every Nth call only, `OCP_PROFILE_MEMORY` adds
+    tracemalloc snapshots and `OCP_PROFILE_DIR` sets where profiles are written.
+    """
+    tools = os.environ.get("OCP_PROFILE", "").strip()
+    if not tools:
+        return
+    configure(
+        tools=None if tools == "*" else [t.strip() for t in tools.split(",") if t.strip()],
+        every=int(os.environ.get("OCP_PROFILE_EVERY") or 1),
+        memory=bool(os.environ.get("OCP_PROFILE_MEMORY")),
+        directory=os.environ.get("OCP_PROFILE_DIR"),
+    )
+
+
+def status() -> dict:
+    """Returns the profiling settings and the last profiles written."""
+    return {
+        "enabled": _settings.enabled,
+        "tools": sorted(_settings.tools) if _settings.tools else "*",
+        "every": _settings.every,
+        "memory": _settings.memory,
+        "directory": _settings.directory,
+        "recent": list(_recent),
+    }
+
+
+def _should_profile(name: str) -> bool:
+    if _settings.tools is not None and name not in _settings.tools:
+        return False
+    with _lock:
+        _calls[name] += 1
+        return _calls[name] % _settings.every == 0
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of every other thread at a fixed interval, counting each distinct stack."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="ocp-profiler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+@contextmanager
+def _profile(name: str):
+    global _tracing
+    memory = _settings.memory
+    if memory:
+        with _lock:
+            if _tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+            _tracing += 1
+    sampler = _Sampler(_settings.interval)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        sampler.stop()
+        snapshot = None
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            with _lock:
+                _tracing -= 1
+                if _tracing == 0:
+                    tracemalloc.stop()
+        try:
+            _write(name, seconds, sampler.stacks, snapshot)
+        except OSError:
+            # A profile that cannot be written must not fail the tool call
+            logger.warning("Could not write the profile of %s", name, exc_info=True)
+
+
+def _write(name: str, seconds: float, stacks: Counter, snapshot):
+    """Writes the collapsed stacks, readable by flamegraph.pl or speedscope, and the allocation snapshot."""
+    os.makedirs(_settings.directory, exist_ok=True)
+    base = os.path.join(
+        _settings.directory,
+        f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}",
+    )
+    files = [base + ".collapsed"]
+    with open(files[0], "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    if snapshot is not None:
+        snapshot.dump(base + ".tracemalloc")
+        with open(base + ".allocations.txt", "w") as f:
+            for stat in snapshot.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+        files += [base + ".tracemalloc", base + ".allocations.txt"]
+    _recent.append(
+        {"tool": name, "seconds": round(seconds, 3), "samples": sum(stacks.values()), "files": files}
+    )
+
+
+def profiled(fn):
+    """Profiles the calls of a tool when profiling is turned on for it."""
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not _settings.enabled or not _should_profile(name):
+                return await fn(*args, **kwargs)
+            with _profile(name):
+                return await fn(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _settings.enabled or not _should_profile(name):
+                return fn(*args, **kwargs)
+            with _profile(name):
+                return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """A thread-safe token bucket allowing `rate` requests per second with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str) -> RateLimiter:
+    """Returns the rate limiter shared by every client of a host in this process.
+
+    The budget is set by `OCP_RATE_LIMIT` in requests per second. It is unset by
+    default, which disables rate limiting.
+    """
+    with _lock:
+        if host not in _limiters:
+            rate = float(os.environ.get("OCP_RATE_LIMIT") or 0)
+            _limiters[host] = RateLimiter(rate)
+        return _limiters[host]
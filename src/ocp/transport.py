@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+
+import requests
+
+try:
+    import httpx
+    import h2  # noqa: F401  # httpx needs it for HTTP/2
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_lock = threading.Lock()
+
+
+class _Response:
+    """Wraps an `httpx` response in the `requests` interface the clients use."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = response.content
+        self.http_version = response.http_version
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    def json(self):
+        return self._response.json()
+
+    def raise_for_status(self):
+        try:
+            self._response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise requests.exceptions.HTTPError(str(e), response=self) from e
+
+
+def _http2_client():
+    """Returns the shared HTTP/2 client, or None if HTTP/2 is disabled or unavailable."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                if not os.environ.get("OCP_HTTP2"):
+                    _client = False
+                elif httpx is None:
+                    logger.warning("OCP_HTTP2 is set but httpx[http2] is not installed; using HTTP/1.1")
+                    _client = False
+                else:
+                    max_connections = int(os.environ.get("OCP_HTTP2_MAX_CONNECTIONS") or 10)
+                    _client = httpx.Client(
+                        http2=True,
+                        timeout=None,
+                        limits=httpx.Limits(max_connections=max_connections),
+                    )
+    return _client or None
+
+
+def request(method: str, url: str, **kwargs):
+    """Sends a request with the configured transport, taking the same arguments as `requests`.
+
+    Requests go through `requests` (HTTP/1.1) unless `OCP_HTTP2` is set. Then they
+    go through one process-wide `httpx` client that multiplexes the concurrent
+    requests to a host over a few HTTP/2 connections, and speaks HTTP/1.1 to hosts
+    that do not support HTTP/2. Without `httpx` and `h2` installed, `OCP_HTTP2`
+    falls back to `requests` with a warning. Either way the response offers the
+    parts of the `requests` interface the clients use, and errors are raised as
+    `requests` exceptions.
+    """
+    client = _http2_client()
+    if client is None:
+        # Looked up on every call so that it can be patched
+        return getattr(requests, method.lower())(url, **kwargs)
+
+    params = kwargs.pop("params", None)
+    if params:
+        # requests leaves out parameters that are None
+        kwargs["params"] = {k: v for k, v in params.items() if v is not None}
+    data = kwargs.get("data")
+    if data is not None and not isinstance(data, (dict, str, bytes)):
+        # A stream of chunks
+        kwargs["content"] = kwargs.pop("data")
+    try:
+        return _Response(client.request(method, url, **kwargs))
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+
+
+def get(url: str, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def put(url: str, **kwargs):
+    return request("PUT", url, **kwargs)
+
+
+def delete(url: str, **kwargs):
+    return request("DELETE", url, **kwargs)
@@ -0,0 +1,166 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import _first, dumps, items
+
+# Number of variables written per request
+BATCH_SIZE = 50
+
+# Keys describing a variable's record rather than its value, which differ between environments
+METADATA_KEYS = frozenset(
+    {
+        "id", "collection_id", "collectionId", "version",
+        "created_at", "createdAt", "created_by", "createdBy",
+        "updated_at", "updatedAt", "updated_by", "updatedBy",
+    }
+)
+
+
+def _variables(collection) -> dict:
+    """Returns the variables of a collection keyed by their key."""
+    if isinstance(collection, dict):
+        collection = _first(collection, "variables", "items", "data") or []
+    variables = {}
+    for variable in collection if isinstance(collection, list) else []:
+        key = isinstance(variable, dict) and _first(variable, "key", "name")
+        if key:
+            variables[key] = variable
+    return variables
+
+
+def _writable(variable: dict) -> dict:
+    return {k: v for k, v in variable.items() if k not in METADATA_KEYS}
+
+
+def value_hash(variable: dict) -> str:
+    """Hashes what a variable holds, leaving out the metadata of its record."""
+    return hashlib.blake2b(dumps(_writable(variable)), digest_size=16).hexdigest()
+
+
+def export_collections(client, names: list | None = None, max_workers: int = 8) -> dict:
+    """Reads every variable collection of an environment, fetching them concurrently.
+
+    Args:
+        client (EnvironmentsManagerClient): The client of the environment
+        names (list, optional): Names of the collections to read. Defaults to all of them
+        max_workers (int, optional): Number of collections fetched at once. Defaults to 8
+
+    Returns:
+        dict: For each collection name, its `id` and its `variables` keyed by key
+    """
+    listing = {}
+    for collection in items(client.get_variable_collections()):
+        collection_id = _first(collection, "id", "collection_id", "collectionId")
+        name = _first(collection, "name", "title") or collection_id
+        if collection_id and (names is None or name in names):
+            listing[name] = collection_id
+
+    def fetch(collection_id):
+        return _variables(client.get_collection_variables(collection_id))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        fetched = pool.map(fetch, listing.values())
+        return {
+            name: {"id": collection_id, "variables": variables}
+            for (name, collection_id), variables in zip(listing.items(), fetched)
+        }
+
+
+def diff_collections(source: dict, target: dict) -> dict:
+    """Compares the collections of two environments, matched by name, variable by variable.
+
+    Variables are matched by key and compared by the hash of their value.
+
+    Args:
+        source (dict): The collections to promote, as returned by `export_collections`
+        target (dict): The collections to update, as returned by `export_collections`
+
+    Returns:
+        dict: The collections found on one side only and, for every collection found
+            on both that differs, the keys of its added, changed and removed variables
+    """
+    collections = {}
+    for name in sorted(source.keys() & target.keys()):
+        ours, theirs = source[name]["variables"], target[name]["variables"]
+        changed = sorted(
+            k for k in ours.keys() & theirs.keys() if value_hash(ours[k]) != value_hash(theirs[k])
+        )
+        added = sorted(ours.keys() - theirs.keys())
+        removed = sorted(theirs.keys() - ours.keys())
+        if added or changed or removed:
+            collections[name] = {
+                "source_id": source[name]["id"],
+                "target_id": target[name]["id"],
+                "added": added,
+                "changed": changed,
+                "removed": removed,
+                "unchanged": len(ours.keys() & theirs.keys()) - len(changed),
+            }
+    return {
+        "only_in_source": sorted(source.keys() - target.keys()),
+        "only_in_target": sorted(target.keys() - source.keys()),
+        "collections": collections,
+    }
+
+
+def sync_collections(
+    source_client,
+    target_client,
+    names: list | None = None,
+    dry_run: bool = True,
+    batch_size: int = BATCH_SIZE,
+    max_workers: int = 8,
+) -> dict:
+    """Writes the added and changed variables of the source collections to the target ones.
+
+    Both environments are read concurrently and only the variables that differ are
+    written, `batch_size` at a time. Variables only found in the target are
+    reported but never deleted, and collections missing from the target are not
+    created.
+
+    Args:
+        source_client (EnvironmentsManagerClient): The client of the environment to promote from
+        target_client (EnvironmentsManagerClient): The client of the environment to update
+        names (list, optional): Names of the collections to sync. Defaults to all of them
+        dry_run (bool, optional): Only report what would be written. Defaults to True
+        batch_size (int, optional): Number of variables written per request. Defaults to 50
+        max_workers (int, optional): Number of requests made at once. Defaults to 8
+
+    Returns:
+        dict: The diff, with the number of variables and requests written (or to be
+            written) per collection and the errors of the failed writes
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        source = pool.submit(export_collections, source_client, names, max_workers)
+        target = pool.submit(export_collections, target_client, names, max_workers)
+        source, target = source.result(), target.result()
+    report = diff_collections(source, target)
+    report["dry_run"] = dry_run
+
+    batches = []
+    for name, diff in report["collections"].items():
+        variables = source[name]["variables"]
+        keys = diff["added"] + diff["changed"]
+        diff["batches"] = -(-len(keys) // batch_size)
+        diff["written"] = 0 if dry_run else len(keys)
+        for i in range(0, len(keys), batch_size):
+            batch = [_writable(variables[k]) for k in keys[i:i + batch_size]]
+            batches.append((name, diff["target_id"], batch))
+    if dry_run or not batches:
+        return report
+
+    def write(batch):
+        name, target_id, variables = batch
+        try:
+            target_client.update_collection_variables(target_id, variables)
+        except Exception as e:
+            return name, len(variables), str(e)
+        return name, 0, None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for name, failed, error in pool.map(write, batches):
+            if error:
+                diff = report["collections"][name]
+                diff["written"] -= failed
+                diff.setdefault("errors", []).append(error)
+    return report
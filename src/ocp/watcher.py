@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import requests
+
+from .environments import get_client, get_environment
+from .environments_manager import EnvironmentsManagerClient
+from .miniapps import MiniAppsClient
+from .models import App, items, loads
+from .orchestrator import OrchestratorClient
+
+logger = logging.getLogger(__name__)
+
+# What is watched: the client class and the listing endpoint of each kind of resource
+WATCHED = {
+    "miniapps": (MiniAppsClient, "miniapps/api/apps", {"pageSize": 1000}),
+    "orchestrator_apps": (OrchestratorClient, "orchestrator/api/apps/pagination/", {"limit": 1000}),
+    "variable_collections": (EnvironmentsManagerClient, "envs-manager/api/v1/variables-collections", None),
+}
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A resource that was added, removed or modified since the previous poll."""
+
+    seq: int
+    kind: str
+    environment: str
+    change: str
+    id: str
+    name: str | None
+    at: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Listing:
+    """What the last poll of a listing saw: its ETag, a fingerprint of the page and of each item."""
+
+    def __init__(self):
+        self.etag = None
+        self.fingerprint = None
+        self.items = None  # id -> (fingerprint, name)
+
+
+class Watcher:
+    """Polls the listings of an environment and reports the resources that changed.
+
+    Polls are cheap: a listing is requested with the ETag of the last response, so
+    an unchanged listing costs a 304 without a body, and a body identical to the
+    previous one is recognised by its fingerprint without decoding it. Only a
+    changed page is decoded and compared item by item. The interval doubles, up to
+    `max_interval`, after every poll without changes or with errors, and drops back
+    to `interval` as soon as something changes.
+
+    Changes are sent to subscribers, kept in a bounded history readable with
+    `events`, and the cached responses of the changed resources are invalidated.
+    """
+
+    def __init__(
+        self,
+        environment: str | None = None,
+        kinds=tuple(WATCHED),
+        interval: float = 30.0,
+        max_interval: float = 600.0,
+        history: int = 1000,
+    ):
+        self.environment = get_environment(environment).name
+        self.kinds = tuple(kinds)
+        self.interval = interval
+        self.max_interval = max_interval
+        self._listings = {kind: _Listing() for kind in self.kinds}
+        self._history = deque(maxlen=history)
+        self._subscribers = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Calls `callback(events)` with the list of events of every poll that found changes.
+
+        Returns:
+            A function that cancels the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def events(self, since: int = 0) -> list[ChangeEvent]:
+        """Returns the events kept in the history with a sequence number above `since`."""
+        with self._lock:
+            return [e for e in self._history if e.seq > since]
+
+    def poll(self) -> list[ChangeEvent]:
+        """Polls every watched listing once. The first poll only records what exists."""
+        events = []
+        for kind in self.kinds:
+            events.extend(self._poll(kind))
+        if not events:
+            return events
+
+        with self._lock:
+            self._history.extend(events)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(events)
+            except Exception:
+                logger.exception("Change subscriber failed")
+        return events
+
+    def start(self):
+        """Polls in a background thread until `stop` is called."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"ocp-watcher-{self.environment}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.wait(delay):
+            try:
+                changed = bool(self.poll())
+            except requests.exceptions.RequestException:
+                logger.warning("Polling %s failed", self.environment, exc_info=True)
+                changed = False
+            delay = self.interval if changed else min(self.max_interval, delay * 2)
+
+    def _poll(self, kind: str) -> list[ChangeEvent]:
+        client_class, endpoint, params = WATCHED[kind]
+        client = get_client(client_class, self.environment)
+        listing = self._listings[kind]
+
+        content, etag = client.get_conditional(endpoint, etag=listing.etag, params=params)
+        listing.etag = etag
+        if content is None:
+            return []
+        fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+        if fingerprint == listing.fingerprint:
+            return []
+        listing.fingerprint = fingerprint
+
+        current = {}
+        for item in items(loads(content)):
+            app = App.from_dict(item)
+            current[app.id] = (hashlib.blake2b(app.raw, digest_size=16).digest(), app.name, item)
+        previous, listing.items = listing.items, {i: v[:2] for i, v in current.items()}
+        if previous is None:
+            return []
+
+        changes = []
+        for item_id, (item_fingerprint, name, item) in current.items():
+            if item_id not in previous:
+                changes.append(("added", item_id, name, item))
+            elif previous[item_id][0] != item_fingerprint:
+                changes.append(("modified", item_id, name, item))
+        for item_id, (_, name) in previous.items():
+            if item_id not in current:
+                changes.append(("removed", item_id, name, None))
+
+        events = []
+        for change, item_id, name, item in changes:
+            self._invalidate(kind, client, item_id, item)
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+            events.append(
+                ChangeEvent(seq, kind, self.environment, change, item_id, name, time.time())
+            )
+        return events
+
+    def _invalidate(self, kind: str, client, item_id: str, item: dict | None):
+        """Drops the cached responses of one changed resource and of the listings above it."""
+        if client.cache is None:
+            return
+        if kind == "miniapps":
+            client._invalidate(f"miniapps/api/apps/{client.get_active_version()}/{item_id}")
+        elif kind == "orchestrator_apps":
+            client._invalidate("orchestrator/api/apps/pagination")
+            canvas_id = item and (item.get("canvas_id") or item.get("canvasId"))
+            # Without the canvas ID, e.g. for a removed app, every canvas has to go
+            if canvas_id:
+                client._invalidate(f"orchestrator/api/canvases/{canvas_id}")
+            else:
+                client._invalidate("orchestrator/api/canvases")
+        else:
+            client._invalidate(f"envs-manager/api/v1/variables-collections/{item_id}")
+
+
+_watchers = {}
+_lock = threading.Lock()
+
+
+def get_watcher(environment: str | None = None) -> Watcher:
+    """Returns the running watcher of an environment, starting it on first use."""
+    name = get_environment(environment).name
+    with _lock:
+        if name not in _watchers:
+            watcher = Watcher(name)
+            # The first poll records what exists; later ones report changes to it
+            watcher.poll()
+            watcher.start()
+            _watchers[name] = watcher
+        return _watchers[name]
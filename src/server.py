@@ -0,0 +1,193 @@
+"""Serves the MCP tools over streamable HTTP, for a server shared by a team.
+
+Usage: python src/server.py [--host HOST] [--port PORT] [--workers N]
+
+With more than one worker, each is a process of its own behind the same port
+and sessions are stateless, since the next request of a client may reach another
+worker. Workers share tokens and cached responses through `OCP_SHARED_STORE`.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+import anyio
+import uvicorn
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from main import mcp
+
+logger = logging.getLogger(__name__)
+
+
+class Backpressure:
+    """Bounds the requests a worker serves at once.
+
+    Up to `max_concurrent` requests run at a time. Up to `max_queued` more wait
+    at most `queue_timeout` seconds for one of them to finish, and the others
+    are turned away at once with 503 and Retry-After, so that clients back off
+    instead of piling up. Health checks are never held back.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrent: int = 32,
+        max_queued: int = 64,
+        queue_timeout: float = 10.0,
+        exempt: tuple = ("/health", "/ready"),
+    ):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.exempt = exempt
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._slots = None  # Created on first use, inside the event loop
+
+    @property
+    def saturated(self) -> bool:
+        return self.active >= self.max_concurrent and self.queued >= self.max_queued
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            return await self.app(scope, receive, send)
+        if self._slots is None:
+            self._slots = anyio.Semaphore(self.max_concurrent)
+
+        try:
+            self._slots.acquire_nowait()
+        except anyio.WouldBlock:
+            if self.queued >= self.max_queued:
+                return await self._reject(scope, receive, send)
+            acquired = False
+            self.queued += 1
+            try:
+                with anyio.move_on_after(self.queue_timeout):
+                    await self._slots.acquire()
+                    acquired = True
+            finally:
+                self.queued -= 1
+            if not acquired:
+                return await self._reject(scope, receive, send)
+
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def _reject(self, scope, receive, send):
+        self.rejected += 1
+        response = JSONResponse(
+            {"error": "The server is busy, retry later."},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+        await response(scope, receive, send)
+
+
+class _State:
+    ready = False
+    backpressure = None
+
+
+_state = _State()
+
+
+async def health(request: Request) -> JSONResponse:
+    """Liveness: the worker is up and its event loop responds."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+async def ready(request: Request) -> JSONResponse:
+    """Readiness: the worker has started, is not shutting down and can take more requests."""
+    backpressure = _state.backpressure
+    is_ready = _state.ready and not (backpressure and backpressure.saturated)
+    body = {"status": "ready" if is_ready else "not ready", "pid": os.getpid()}
+    if backpressure is not None:
+        body.update(
+            active=backpressure.active, queued=backpressure.queued, rejected=backpressure.rejected
+        )
+    return JSONResponse(body, status_code=200 if is_ready else 503)
+
+
+def create_app():
+    """Builds the ASGI app of one worker, configured by the environment set up by `main`."""
+    workers = int(os.environ.get("OCP_SERVER_WORKERS") or 1)
+    # Sessions live in the memory of one worker
+    mcp.settings.stateless_http = workers > 1
+    # Registered here rather than on import: spawned workers import this file twice
+    mcp.custom_route("/health", methods=["GET"])(health)
+    mcp.custom_route("/ready", methods=["GET"])(ready)
+    app = mcp.streamable_http_app()
+
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_lifespan(app):
+            _state.ready = True
+            try:
+                yield
+            finally:
+                # Not ready while the last requests drain
+                _state.ready = False
+
+    app.router.lifespan_context = lifespan
+    _state.backpressure = Backpressure(
+        app,
+        max_concurrent=int(os.environ.get("OCP_MAX_CONCURRENT") or 32),
+        max_queued=int(os.environ.get("OCP_MAX_QUEUED") or 64),
+        queue_timeout=float(os.environ.get("OCP_QUEUE_TIMEOUT") or 10),
+    )
+    return _state.backpressure
+
+
+def _share_state(workers: int):
+    """Sets up the environment the workers inherit so that they share tokens, cache and rate budget."""
+    os.environ["OCP_SERVER_WORKERS"] = str(workers)
+    if workers < 2:
+        return
+    if not os.environ.get("OCP_SHARED_STORE"):
+        # mkdtemp creates a directory only its owner can use
+        directory = tempfile.mkdtemp(prefix="ocp-server-")
+        os.environ["OCP_SHARED_STORE"] = os.path.join(directory, "store.db")
+        logger.info("Sharing tokens and responses through %s", os.environ["OCP_SHARED_STORE"])
+    rate = float(os.environ.get("OCP_RATE_LIMIT") or 0)
+    if rate > 0:
+        # OCP_RATE_LIMIT is the budget of the server, split between the workers
+        os.environ["OCP_RATE_LIMIT"] = str(rate / workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the OCP MCP tools over streamable HTTP.")
+    parser.add_argument("--host", default=os.environ.get("OCP_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("OCP_SERVER_PORT") or 8000))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("OCP_SERVER_WORKERS") or 1)
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    _share_state(args.workers)
+    uvicorn.run(
+        "server:create_app",
+        factory=True,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # On SIGTERM, stop accepting connections and give running calls this long to finish
+        timeout_graceful_shutdown=float(os.environ.get("OCP_SHUTDOWN_TIMEOUT") or 30),
+    )
+
+
+if __name__ == "__main__":
+    main()
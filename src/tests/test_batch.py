@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.batch import run_batch
+from ocp.ratelimit import RateLimiter
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def test_results_in_order_with_errors(self):
+        def call(tool, arguments):
+            if tool == "fail":
+                raise RuntimeError("nope")
+            time.sleep(arguments.get("delay", 0))
+            return arguments["value"]
+
+        results = run_batch(
+            [
+                {"tool": "echo", "arguments": {"value": 1, "delay": 0.05}},
+                {"tool": "fail"},
+                {"tool": "echo", "arguments": {"value": 3}},
+            ],
+            call,
+        )
+
+        self.assertEqual(
+            results,
+            [
+                {"id": "0", "tool": "echo", "result": 1},
+                {"id": "1", "tool": "fail", "error": "RuntimeError: nope"},
+                {"id": "2", "tool": "echo", "result": 3},
+            ],
+        )
+
+    def test_runs_concurrently(self):
+        barrier = threading.Barrier(4, timeout=2)
+
+        def call(tool, arguments):
+            # Only returns if all four calls are in flight at the same time
+            barrier.wait()
+            return True
+
+        results = run_batch([{"tool": "t"}] * 4, call, max_concurrency=4)
+
+        self.assertTrue(all(r["result"] for r in results))
+
+    def test_dependencies(self):
+        order = []
+
+        def call(tool, arguments):
+            order.append(tool)
+            if tool == "bad":
+                raise ValueError("bad")
+            return tool
+
+        results = run_batch(
+            [
+                {"id": "second", "tool": "b", "depends_on": ["first"]},
+                {"id": "first", "tool": "a"},
+                {"id": "broken", "tool": "bad"},
+                {"id": "after-broken", "tool": "c", "depends_on": ["broken"]},
+                {"id": "after-after", "tool": "d", "depends_on": ["after-broken"]},
+            ],
+            call,
+            max_concurrency=1,
+        )
+
+        self.assertLess(order.index("a"), order.index("b"))
+        self.assertNotIn("c", order)
+        self.assertNotIn("d", order)
+        self.assertEqual(results[0]["result"], "b")
+        self.assertIn("broken", results[3]["error"])
+        self.assertIn("after-broken", results[4]["error"])
+
+    def test_circular_dependency(self):
+        results = run_batch(
+            [
+                {"id": "a", "tool": "x", "depends_on": ["b"]},
+                {"id": "b", "tool": "x", "depends_on": ["a"]},
+            ],
+            lambda tool, arguments: None,
+        )
+
+        self.assertTrue(all("circular" in r["error"] for r in results))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            run_batch([{"id": "a", "tool": "x"}, {"id": "a", "tool": "y"}], print)
+        with self.assertRaises(ValueError):
+            run_batch([{"tool": "x", "depends_on": ["missing"]}], print)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    @patch("time.sleep")
+    @patch("time.monotonic")
+    def test_bucket(self, mock_monotonic, mock_sleep):
+        mock_monotonic.return_value = 0.0
+        limiter = RateLimiter(rate=4, burst=2)
+
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+
+        # The third request has to wait a quarter of a second for a token to refill
+        mock_sleep.side_effect = lambda s: setattr(
+            mock_monotonic, "return_value", mock_monotonic.return_value + s
+        )
+        limiter.acquire()
+        mock_sleep.assert_called_once_with(0.25)
+        self.assertEqual(mock_monotonic.return_value, 0.25)
+
+    def test_disabled(self):
+        limiter = RateLimiter(rate=0)
+        for _ in range(100):
+            limiter.acquire()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.authentication import Authentication
+from ocp.base import BaseClient
+from ocp.cache import MemoryCache, SharedStore
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    @patch("time.time")
+    def test_ttl(self, mock_time):
+        cache = MemoryCache()
+        mock_time.return_value = 1000
+        cache.set("a", {"x": 1}, ttl=10)
+
+        self.assertEqual(cache.get("a"), {"x": 1})
+        mock_time.return_value = 1010
+        self.assertIsNone(cache.get("a"))
+
+    def test_bounded(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("apps/1#u", 1, ttl=60)
+        cache.set("apps/2#u", 2, ttl=60)
+        cache.set("canvases/1#u", 3, ttl=60)
+
+        self.assertIsNone(cache.get("apps/1#u"))
+        self.assertEqual(cache.get("canvases/1#u"), 3)
+
+    def test_invalidate_on_path_boundary(self):
+        cache = MemoryCache()
+        for key in ("apps/1#u", "apps/1?{}#u", "apps/1/versions#u", "apps/10#u", "apps#u"):
+            cache.set(key, 1, ttl=60)
+
+        self.assertEqual(cache.invalidate("apps/1"), 3)
+        self.assertEqual(cache.get("apps/10#u"), 1)
+        self.assertEqual(cache.invalidate("apps", subtree=False), 1)
+        self.assertEqual(cache.get("apps/10#u"), 1)
+
+    def test_values_are_copies(self):
+        """Test that changing a returned value does not change the cached one."""
+        cache = MemoryCache()
+        cache.set("app#u", {"model": {"prompt": "hello"}}, ttl=60)
+
+        cache.get("app#u")["model"]["prompt"] = "unsaved"
+
+        self.assertEqual(cache.get("app#u"), {"model": {"prompt": "hello"}})
+
+
+class TestSharedStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "store.db")
+
+    def test_shared_between_instances(self):
+        """Test that what one process writes another one reads."""
+        writer, reader = SharedStore(self.path), SharedStore(self.path)
+
+        writer.set_token("host|user", "access", "refresh", 5000.0)
+        writer.set("http://host/apps", {"items": [1]}, ttl=60)
+
+        self.assertEqual(
+            reader.get_token("host|user"),
+            {"access_token": "access", "refresh_token": "refresh", "expiry": 5000.0},
+        )
+        self.assertEqual(reader.get("http://host/apps"), {"items": [1]})
+        self.assertEqual(reader.invalidate("http://host/apps"), 1)
+        self.assertIsNone(writer.get("http://host/apps"))
+
+    def test_private_file(self):
+        SharedStore(self.path)
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_expired_responses(self):
+        store = SharedStore(self.path)
+        store.set("key", [1, 2], ttl=-1)
+
+        self.assertIsNone(store.get("key"))
+
+
+class TestSharedLogin(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = SharedStore(os.path.join(self.tmp.name, "store.db"))
+        env = {
+            "OCP_HOST": "http://fake-host.com",
+            "OCP_USERNAME": "user",
+            "OCP_PASSWORD": "password",
+        }
+        with patch.dict(os.environ, env):
+            self.first, self.second = Authentication(), Authentication()
+
+    @patch("requests.post")
+    def test_one_login_per_host(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "access_token": "shared_token",
+            "refresh_token": "shared_refresh",
+            "expires_in": 3600,
+        }
+        mock_post.return_value = mock_response
+
+        with patch("ocp.authentication.get_shared_store", return_value=self.store):
+            self.assertEqual(self.first.get_token(), "shared_token")
+            self.assertEqual(self.second.get_token(), "shared_token")
+
+        mock_post.assert_called_once()
+        self.assertEqual(self.second._refresh_token, "shared_refresh")
+
+
+class TestBaseClientResponseCache(unittest.TestCase):
+
+    @patch("ocp.base.get_response_cache")
+    @patch("ocp.base.Authentication")
+    def setUp(self, MockAuthentication, mock_get_response_cache):
+        self.mock_auth_instance = MockAuthentication.return_value
+        self.mock_auth_instance.host = "http://fake-host.com"
+        self.mock_auth_instance.username = "user"
+        self.mock_auth_instance.get_token.return_value = "fake_token"
+        self.cache = MemoryCache()
+        mock_get_response_cache.return_value = (self.cache, 60)
+        self.client = BaseClient()
+
+    @patch("requests.put")
+    @patch("requests.get")
+    def test_get_is_cached_until_written(self, mock_get, mock_put):
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {"id": 1}
+        mock_put.return_value = MagicMock(status_code=200)
+
+        self.client.get("apps/1", params={"a": 1})
+        self.assertEqual(self.client.get("apps/1", params={"a": 1}), {"id": 1})
+        self.assertEqual(mock_get.call_count, 1)
+        # A cache hit does not need a token
+        self.mock_auth_instance.get_token.assert_called_once()
+
+        self.client.get("apps/1", params={"a": 2})
+        self.assertEqual(mock_get.call_count, 2)
+
+        self.client.put("apps/1", json={})
+        self.client.get("apps/1", params={"a": 1})
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("requests.put")
+    @patch("requests.get")
+    def test_write_invalidates_listing(self, mock_get, mock_put):
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {"items": []}
+        mock_put.return_value = MagicMock(status_code=200)
+        self.client.get("miniapps/api/apps", params={"pageSize": 10})
+        self.client.get("miniapps/api/apps/v1/10")
+
+        self.client.put("miniapps/api/apps/v1/1", files={})
+        self.client.get("miniapps/api/apps", params={"pageSize": 10})
+        self.client.get("miniapps/api/apps/v1/10")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("requests.get")
+    def test_responses_are_scoped_to_the_login(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {"id": 1}
+        self.client.get("apps/1")
+
+        self.mock_auth_instance.username = "someone_else"
+        self.client.get("apps/1")
+
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
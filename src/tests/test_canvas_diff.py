@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.canvas_diff import diff_canvases
+from ocp.models import Canvas
+
+
+def node(node_id, prompt, x=0):
+    return {
+        "id": node_id,
+        "type": "miniapp",
+        "position": {"x": x, "y": 0},
+        "data": {"label": node_id.title(), "prompt": prompt},
+    }
+
+
+def edge(source, target, handle="next"):
+    return {"source": source, "target": target, "sourceHandle": handle}
+
+
+BASE = {
+    "id": "v1",
+    "nodes": [node("start", "Hi"), node("menu", "Pick one"), node("agent", "Hold on"), node("bye", "Bye")],
+    "edges": [edge("start", "menu"), edge("menu", "agent", "agent"), edge("menu", "bye", "done")],
+}
+
+
+class TestDiffCanvases(unittest.TestCase):
+
+    def test_identical(self):
+        diff = diff_canvases(Canvas.from_dict(BASE), Canvas.from_dict(BASE))
+
+        self.assertEqual(diff["unchanged_nodes"], 4)
+        self.assertFalse(any(diff["nodes"].values()))
+        self.assertFalse(any(diff["edges"].values()))
+
+    def test_changes(self):
+        target = {
+            "id": "v2",
+            "nodes": [
+                node("start", "Hi", x=50),
+                node("menu", "Pick an option"),
+                node("survey", "Rate us"),
+                node("bye", "Bye"),
+            ],
+            "edges": [
+                edge("start", "menu"),
+                edge("menu", "survey", "done"),
+                edge("survey", "bye"),
+            ],
+        }
+
+        diff = diff_canvases(Canvas.from_dict(BASE), Canvas.from_dict(target))
+
+        self.assertEqual(diff["nodes"]["moved"], ["start"])
+        self.assertEqual(
+            diff["nodes"]["modified"],
+            [{"id": "menu", "type": "miniapp", "name": "Menu", "fields": ["data.prompt"]}],
+        )
+        self.assertEqual([n["id"] for n in diff["nodes"]["added"]], ["survey"])
+        self.assertEqual([n["id"] for n in diff["nodes"]["removed"]], ["agent"])
+        self.assertEqual(
+            diff["edges"]["rewired"],
+            [{"source": "menu", "source_handle": "done", "from": "bye", "to": "survey"}],
+        )
+        self.assertEqual(
+            diff["edges"]["removed"],
+            [{"source": "menu", "source_handle": "agent", "target": "agent", "target_handle": None}],
+        )
+        self.assertEqual(
+            diff["edges"]["added"],
+            [{"source": "survey", "source_handle": "next", "target": "bye", "target_handle": None}],
+        )
+
+    def test_copies_are_matched_by_content(self):
+        renamed = {
+            "nodes": [{**n, "id": f"copy-{n['id']}"} for n in BASE["nodes"]],
+            "edges": [
+                {**e, "source": f"copy-{e['source']}", "target": f"copy-{e['target']}"}
+                for e in BASE["edges"]
+            ],
+        }
+
+        diff = diff_canvases(Canvas.from_dict(BASE), Canvas.from_dict(renamed))
+
+        self.assertEqual(len(diff["nodes"]["matched_by_content"]), 4)
+        self.assertEqual(diff["nodes"]["added"], [])
+        self.assertEqual(diff["edges"], {"added": [], "removed": [], "rewired": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
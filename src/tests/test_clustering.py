@@ -0,0 +1,73 @@
+import json
+import unittest
+import os
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.clustering import MinHasher, cluster_paths, path_signature
+
+
+def make_log(*states):
+    return json.dumps({"steps": [{"state": s} for s in states]})
+
+
+class TestPathSignature(unittest.TestCase):
+
+    def test_repeats_are_collapsed(self):
+        log = make_log("Welcome", "Ask", "Ask", "Ask", "Transfer")
+        self.assertEqual(path_signature(log), ("Welcome", "Ask", "Transfer"))
+
+    def test_empty_log(self):
+        self.assertEqual(path_signature(""), ())
+
+
+class TestMinHasher(unittest.TestCase):
+
+    def test_similarity_estimate(self):
+        hasher = MinHasher(num_perm=128)
+        a = ("A", "B", "C", "D", "E", "F")
+        self.assertEqual(hasher.similarity(hasher.signature(a), hasher.signature(a)), 1.0)
+        # Disjoint paths share no shingle
+        self.assertLess(
+            hasher.similarity(hasher.signature(a), hasher.signature(("X", "Y", "Z"))), 0.1
+        )
+
+
+class TestClusterPaths(unittest.TestCase):
+
+    def test_exact_and_near_duplicates(self):
+        long_path = tuple(f"S{i}" for i in range(20))
+        near = long_path[:-1] + ("Other",)
+        paths = {
+            "d1": long_path,
+            "d2": long_path,
+            "d3": long_path,
+            "d4": near,
+            "d5": ("Welcome", "Transfer"),
+        }
+
+        clusters = cluster_paths(paths, threshold=0.8)
+
+        self.assertEqual([c.size for c in clusters], [4, 1])
+        self.assertEqual(clusters[0].path, long_path)
+        self.assertEqual(clusters[0].representative, "d1")
+        self.assertEqual(sorted(clusters[0].dialog_ids), ["d1", "d2", "d3", "d4"])
+
+    def test_exact_only(self):
+        paths = {"d1": ("A", "B", "C"), "d2": ("A", "B", "D"), "d3": ("A", "B", "C")}
+
+        clusters = cluster_paths(paths, threshold=1.0)
+
+        self.assertEqual([c.size for c in clusters], [2, 1])
+
+    def test_invalid_bands(self):
+        with self.assertRaises(ValueError):
+            cluster_paths({}, num_perm=64, bands=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
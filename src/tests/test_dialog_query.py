@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.dialog_query import (
+    And, Not, Or, Predicate, QueryError, compile_query, parse, plan_query,
+)
+
+
+DIALOG = {
+    "dialog_id": "d1",
+    "durationMs": 75000,
+    "steps": 12,
+    "outcome": "Transfer",
+    "intents": ["billing", "agent"],
+    "start_time": "2024-07-01T10:30:00Z",
+    "variables": {"lang": "en"},
+}
+
+
+def matches(query: str, dialog: dict = DIALOG) -> bool:
+    return compile_query(parse(query))(dialog)
+
+
+class TestParse(unittest.TestCase):
+    def test_precedence(self):
+        node = parse('steps > 3 or not outcome = "hangup" and intent in ("a", "b")')
+
+        self.assertEqual(
+            node,
+            Or((
+                Predicate("steps", ">", 3),
+                And((Not(Predicate("outcome", "=", "hangup")), Predicate("intent", "in", ("a", "b")))),
+            )),
+        )
+
+    def test_round_trip(self):
+        text = 'duration between 1.5 and 10 and (ani = "+1 \\"x\\"" or region exists)'
+
+        self.assertEqual(parse(str(parse(text))), parse(text))
+
+    def test_errors(self):
+        for query in ["", "steps >", "steps ~ 3", "(steps > 3", "steps in 3", "steps > 3 4"]:
+            with self.subTest(query=query):
+                with self.assertRaises(QueryError):
+                    parse(query)
+
+
+class TestMatches(unittest.TestCase):
+    def test_fields(self):
+        self.assertTrue(matches("duration > 60000 and steps between 10 and 20"))
+        # Strings compare case-insensitively
+        self.assertTrue(matches('outcome = "transfer"'))
+        # A list matches when any of its items does
+        self.assertTrue(matches('intent = "agent"'))
+        self.assertFalse(matches('intent != "agent"'))
+        self.assertTrue(matches('variables.lang = "en" and id contains "D"'))
+
+    def test_derived_from_start_time(self):
+        self.assertTrue(matches("hour between 9 and 17 and weekday = 1"))
+        self.assertTrue(matches('date = "2024-07-01"'))
+        self.assertTrue(matches("hour < 9", {"start_ms": 1719835200000 - 5 * 3600000}))
+
+    def test_missing_and_mismatched_values(self):
+        self.assertFalse(matches('region = "eu"'))
+        self.assertTrue(matches('region != "eu"'))
+        self.assertTrue(matches("not region exists"))
+        self.assertFalse(matches('steps > "many"'))
+
+
+class TestPlan(unittest.TestCase):
+    def test_pushes_down_supported_conjuncts(self):
+        plan = plan_query(
+            'ani in ("+1", "+2") and region = "eu" and steps >= 5 and duration > 100 and region = "us"'
+        )
+
+        self.assertEqual(plan.filters, {"ani": ["+1", "+2"], "region": "eu", "steps_gt": 4})
+        self.assertEqual(str(plan.residual), 'duration > 100 and region = "us"')
+
+    def test_disjunction_is_not_pushed_down(self):
+        plan = plan_query('region = "eu" or steps > 3')
+
+        self.assertEqual(plan.filters, {})
+        self.assertTrue(plan.matches({"steps": 4}))
+
+    def test_fully_pushed_down(self):
+        plan = plan_query('dialog_group = "g" and ocp_group_name = "sales"')
+
+        self.assertEqual(plan.filters, {"dialog_group": "g", "ocp_group_names": ["sales"]})
+        self.assertIsNone(plan.residual)
+        self.assertTrue(plan.matches({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp import environments
+from ocp.environments import (
+    Environment,
+    fan_out,
+    get_client,
+    load_environments,
+    merge_tagged,
+)
+from ocp.insights import InsightsClient
+from ocp.miniapps import MiniAppsClient
+
+
+BASE_ENV = {
+    "OCP_HOST": "https://us1-m.ocp.ai",
+    "OCP_USERNAME": "user",
+    "OCP_PASSWORD": "password",
+}
+
+
+class TestLoadEnvironments(unittest.TestCase):
+
+    def test_default_only(self):
+        with patch.dict(os.environ, BASE_ENV):
+            registry = load_environments()
+
+        self.assertEqual(list(registry), ["default"])
+        self.assertEqual(registry["default"].get_analytics_host(), "https://us1-a.ocp.ai")
+
+    def test_from_variables(self):
+        env = {
+            **BASE_ENV,
+            "OCP_ENVIRONMENTS": "eu1, tenant-b",
+            "OCP_EU1_HOST": "https://eu1-m.ocp.ai/",
+            "OCP_TENANT_B_HOST": "https://b.example.com",
+            "OCP_TENANT_B_ANALYTICS_HOST": "https://b-analytics.example.com",
+            "OCP_TENANT_B_USERNAME": "b-user",
+        }
+        with patch.dict(os.environ, env):
+            registry = load_environments()
+
+        self.assertEqual(list(registry), ["default", "eu1", "tenant-b"])
+        self.assertEqual(registry["eu1"].host, "https://eu1-m.ocp.ai")
+        self.assertEqual(registry["eu1"].get_analytics_host(), "https://eu1-a.ocp.ai")
+        self.assertEqual(registry["eu1"].username, "user")
+        self.assertEqual(registry["tenant-b"].username, "b-user")
+        self.assertEqual(registry["tenant-b"].password, "password")
+        self.assertEqual(
+            registry["tenant-b"].get_analytics_host(), "https://b-analytics.example.com"
+        )
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"staging": {"host": "https://staging.example.com"}}, f)
+        self.addCleanup(os.remove, f.name)
+
+        with patch.dict(os.environ, {**BASE_ENV, "OCP_ENVIRONMENTS_FILE": f.name}):
+            registry = load_environments()
+
+        self.assertEqual(registry["staging"].host, "https://staging.example.com")
+        self.assertEqual(registry["staging"].get_analytics_host(), "https://staging.example.com")
+
+    def test_missing_host(self):
+        with patch.dict(os.environ, {**BASE_ENV, "OCP_ENVIRONMENTS": "eu2"}):
+            with self.assertRaisesRegex(ValueError, "OCP_EU2_HOST"):
+                load_environments()
+
+
+class TestClientsAndFanOut(unittest.TestCase):
+
+    def setUp(self):
+        registry = {
+            "default": Environment("default", "https://us1-m.ocp.ai"),
+            "eu1": Environment("eu1", "https://eu1-m.ocp.ai"),
+        }
+        patcher = patch.multiple(environments, _environments=registry, _clients={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("ocp.base.Authentication")
+    def test_clients_are_pooled_per_environment(self, MockAuthentication):
+        MockAuthentication.side_effect = lambda env: type("Auth", (), {"host": env.host})()
+
+        client = get_client(InsightsClient, "eu1")
+
+        self.assertIs(get_client(InsightsClient, "eu1"), client)
+        self.assertIsNot(get_client(MiniAppsClient, "eu1"), client)
+        self.assertIsNot(get_client(InsightsClient), client)
+        self.assertEqual(client.base_url, "https://eu1-a.ocp.ai")
+        with self.assertRaisesRegex(ValueError, "Unknown environment"):
+            get_client(InsightsClient, "ap1")
+
+    def test_fan_out_and_merge(self):
+        def fetch(env):
+            if env == "eu1":
+                raise RuntimeError("boom")
+            return [{"id": "a"}, {"id": "b"}]
+
+        merged = merge_tagged(fan_out(fetch, ["default", "eu1"]))
+
+        self.assertEqual(
+            merged,
+            [
+                {"id": "a", "environment": "default"},
+                {"id": "b", "environment": "default"},
+                {"environment": "eu1", "error": "boom"},
+            ],
+        )
+
+    def test_merge_keeps_pages_whole(self):
+        page = {"total": 2, "pages": [1], "items": [{"id": "a"}]}
+
+        merged = merge_tagged({"default": page})
+
+        self.assertEqual(merged, [{"environment": "default", "result": page}])
+
+    def test_fan_out_unknown_environment(self):
+        with self.assertRaises(ValueError):
+            fan_out(lambda env: [], ["nowhere"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import threading
 import unittest
 from unittest.mock import patch
 from src.ocp.insights import InsightsClient
@@ -44,5 +45,84 @@ class TestInsightsClientConstructor(unittest.TestCase):
         client = InsightsClient()
         self.assertEqual(client.base_url, "https://custom.ocp.ai")
 
+class TestIncrementalSearch(unittest.TestCase):
+    @patch("src.ocp.base.Authentication")
+    def setUp(self, MockAuth):
+        MockAuth.return_value.host = "https://custom.ocp.ai"
+        self.client = InsightsClient(log_cache=False)
+
+    def test_slices_newest_first_until_size(self):
+        pages = [
+            {"dialogs": [{"id": "a"}, {"id": "b"}]},
+            {"dialogs": [{"id": "b"}, {"id": "c"}]},
+            {"dialogs": [{"id": "d"}]},
+        ]
+        with patch.object(self.client, "post", side_effect=pages) as mock_post:
+            chunks = list(
+                self.client.iter_dialog_slices(["app.group"], "0", "3000", size=4, slices=3)
+            )
+
+        # The dialog on the boundary of two slices is reported once
+        self.assertEqual(chunks, [[{"id": "a"}, {"id": "b"}], [{"id": "c"}], [{"id": "d"}]])
+        windows = [
+            (c.kwargs["json"]["from_ms"], c.kwargs["json"]["to_ms"], c.kwargs["json"]["size"])
+            for c in mock_post.call_args_list
+        ]
+        self.assertEqual(windows, [("2000", "3000", 4), ("1000", "2000", 2), ("0", "1000", 1)])
+
+    def test_cancelled_slices(self):
+        cancelled = threading.Event()
+        with patch.object(self.client, "post", return_value={"dialogs": [{"id": "a"}]}) as mock_post:
+            slices = self.client.iter_dialog_slices(
+                ["app.group"], "0", "3000", size=10, slices=3, cancelled=cancelled
+            )
+            next(slices)
+            cancelled.set()
+
+            self.assertEqual(list(slices), [])
+        mock_post.assert_called_once()
+
+    def test_cancelled_logs_are_not_requested(self):
+        cancelled = threading.Event()
+        requested = []
+
+        def get_dialog_log(dialog_id):
+            requested.append(dialog_id)
+            cancelled.set()
+            return "log"
+
+        with patch.object(self.client, "get_dialog_log", side_effect=get_dialog_log):
+            logs = list(
+                self.client.iter_dialog_logs(["a", "b", "c"], max_workers=1, cancelled=cancelled)
+            )
+
+        self.assertEqual(requested, ["a"])
+        self.assertEqual(logs, [])
+
+    def test_group_names_of_every_app(self):
+        payload = self.client._search_payload(["a.sales", "b.support", "c.sales"], "0", "1", 10)
+
+        self.assertEqual(payload["query_params"]["ocp_group_names"], ["sales", "support"])
+
+    def test_query_pushes_down_and_filters_the_rest(self):
+        pages = [
+            {"dialogs": [{"id": "a", "duration_ms": 90000}, {"id": "b", "duration_ms": 1000}]},
+            {"dialogs": [{"id": "c", "duration_ms": 70000}, {"id": "d", "duration_ms": 80000}]},
+            {"dialogs": [{"id": "e", "duration_ms": 99000}]},
+        ]
+        with patch.object(self.client, "post", side_effect=pages) as mock_post:
+            chunks = list(
+                self.client.query_dialogs(
+                    ["app.group"], 'region = "eu" and duration > 60000', "0", "3000",
+                    size=2, max_scanned=300,
+                )
+            )
+
+        self.assertEqual(chunks, [([{"id": "a", "duration_ms": 90000}], 2),
+                                  ([{"id": "c", "duration_ms": 70000}], 4)])
+        # The search stops once enough dialogs matched
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_post.call_args.kwargs["json"]["region"], "eu")
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,126 @@
+import json
+import unittest
+import os
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.dialog_logs import Step, parse_steps
+from ocp.latency import LatencyHistogram, LatencyProfile, profile_logs
+
+
+JSON_LOG = json.dumps(
+    {
+        "steps": [
+            {"state": "Welcome", "timestamp": 1720000000000},
+            {"state": "GetBalance", "integration": "CoreBanking", "timestamp": 1720000000500},
+            {"state": "Goodbye", "timestamp": 1720000003500, "duration_ms": 200},
+        ]
+    }
+)
+
+TEXT_LOG = """2024-07-01T12:00:00.000Z INFO state=Welcome entered
+2024-07-01T12:00:01.250Z INFO state=Identify integration=CRM
+some line without a timestamp
+2024-07-01T12:00:04.000Z INFO dialog ended
+"""
+
+
+class TestParseSteps(unittest.TestCase):
+
+    def test_parse_json_log(self):
+        """Test that durations are derived from consecutive steps in a JSON log."""
+        steps = parse_steps(JSON_LOG)
+
+        self.assertEqual([s.state for s in steps], ["Welcome", "GetBalance", "Goodbye"])
+        self.assertEqual(steps[0].duration_ms, 500)
+        self.assertEqual(steps[1], Step("GetBalance", "CoreBanking", 1720000000500, 3000))
+        self.assertEqual(steps[2].duration_ms, 200)
+
+    def test_parse_text_log(self):
+        """Test parsing the line-oriented form of the log."""
+        steps = parse_steps(TEXT_LOG)
+
+        self.assertEqual([s.state for s in steps], ["Welcome", "Identify"])
+        self.assertEqual(steps[0].duration_ms, 1250)
+        self.assertEqual(steps[1].integration, "CRM")
+        # The last step has nothing after it to measure against
+        self.assertIsNone(steps[1].duration_ms)
+
+    def test_parse_malformed_values(self):
+        """Test that bad values in one step do not fail the whole log."""
+        log = json.dumps(
+            [
+                {"state": "A", "duration": "1.2s", "integration": {"name": "CRM"}},
+                {"state": {"unexpected": True}},
+                {"state": "B", "duration": "300", "integration": ["x"]},
+            ]
+        )
+
+        steps = parse_steps(log)
+
+        self.assertEqual(steps, [Step("A", "CRM"), Step("B", None, None, 300.0)])
+
+    def test_parse_empty(self):
+        self.assertEqual(parse_steps(""), [])
+        self.assertEqual(parse_steps("{}"), [])
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        """Test that percentiles stay within the histogram precision."""
+        histogram = LatencyHistogram(precision=0.01)
+        for value in range(1, 1001):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 1000)
+        for p, expected in ((50, 500), (95, 950), (99, 990)):
+            with self.subTest(p=p):
+                self.assertAlmostEqual(histogram.percentile(p), expected, delta=expected * 0.01)
+        self.assertEqual(histogram.percentile(100), 1000)
+
+    def test_merge(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(10)
+        b.record(1000)
+        a.merge(b)
+
+        self.assertEqual(a.count, 2)
+        self.assertEqual(a.max, 1000)
+        with self.assertRaises(ValueError):
+            a.merge(LatencyHistogram(precision=0.1))
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().percentile(99), 0.0)
+
+
+class TestLatencyProfile(unittest.TestCase):
+
+    def test_slowest_states(self):
+        profile = profile_logs([JSON_LOG, TEXT_LOG], processes=0)
+
+        self.assertEqual(profile.dialogs, 2)
+        slowest = profile.slowest_states(top=2)
+        self.assertEqual(slowest[0]["state"], "GetBalance")
+        self.assertEqual(slowest[0]["count"], 1)
+        self.assertEqual(profile.states["Welcome"].count, 2)
+        self.assertEqual(
+            [i["integration"] for i in profile.slowest_integrations()], ["CoreBanking"]
+        )
+
+    def test_process_pool_matches_inline(self):
+        """Test that merging partial profiles from the pool gives the same result."""
+        logs = [JSON_LOG, TEXT_LOG] * 4
+        inline = profile_logs(logs, processes=0)
+        pooled = profile_logs(logs, processes=2, chunk_size=3)
+
+        self.assertEqual(pooled.dialogs, inline.dialogs)
+        self.assertEqual(pooled.slowest_states(), inline.slowest_states())
+
+
+if __name__ == "__main__":
+    unittest.main()
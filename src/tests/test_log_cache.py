@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+import requests
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.dialog_logs import is_dialog_closed
+from ocp.insights import InsightsClient
+from ocp.log_cache import DialogLogCache
+
+
+CLOSED_LOG = json.dumps({"status": "completed", "steps": [{"state": "Welcome"}]})
+OPEN_LOG = json.dumps({"steps": [{"state": "Welcome"}]})
+
+
+class TestDialogLogCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_roundtrip(self):
+        cache = DialogLogCache(self.tmp.name)
+        cache.put("dialog-1", "x" * 10000)
+
+        self.assertEqual(cache.get("dialog-1"), "x" * 10000)
+        self.assertIsNone(cache.get("dialog-2"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        # Stored compressed
+        self.assertLess(cache.stats()["bytes"], 1000)
+
+    def test_lru_eviction(self):
+        cache = DialogLogCache(self.tmp.name, max_bytes=10**6)
+        # Random-ish content so that it does not compress away
+        logs = {f"d{i}": os.urandom(400).hex() for i in range(3)}
+        for dialog_id, log in logs.items():
+            cache.put(dialog_id, log)
+        cache.max_bytes = cache.stats()["bytes"] - 1
+        cache.get("d0")  # d1 is now the least recently used
+        cache.put("d3", os.urandom(10).hex())
+
+        self.assertIsNone(cache.get("d1"))
+        self.assertEqual(cache.get("d0"), logs["d0"])
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_index_survives_restart(self):
+        DialogLogCache(self.tmp.name).put("dialog-1", "log")
+
+        cache = DialogLogCache(self.tmp.name)
+
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.get("dialog-1"), "log")
+
+    def test_budget_shared_between_processes(self):
+        """Test that the budget counts what other caches on the directory wrote."""
+        first = DialogLogCache(self.tmp.name, max_bytes=10**6, rescan_every=1)
+        second = DialogLogCache(self.tmp.name, max_bytes=10**6, rescan_every=1)
+        first.put("d0", os.urandom(400).hex())
+        size = first.stats()["bytes"]
+        first.max_bytes = second.max_bytes = size + size // 2
+
+        second.put("d1", os.urandom(400).hex())
+
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+        self.assertIsNone(first.get("d0"))
+
+    @patch("tempfile.mkstemp", side_effect=OSError(28, "No space left on device"))
+    def test_put_is_best_effort(self, mock_mkstemp):
+        cache = DialogLogCache(self.tmp.name)
+
+        cache.put("dialog-1", "log")
+
+        self.assertIsNone(cache.get("dialog-1"))
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {"OCP_LOG_CACHE_DIR": ""}):
+            self.assertIsNone(DialogLogCache.from_env())
+        with patch.dict(
+            os.environ, {"OCP_LOG_CACHE_DIR": self.tmp.name, "OCP_LOG_CACHE_MAX_MB": "1"}
+        ):
+            self.assertEqual(DialogLogCache.from_env().max_bytes, 1024 * 1024)
+
+
+class TestIsDialogClosed(unittest.TestCase):
+
+    def test_json(self):
+        self.assertTrue(is_dialog_closed(CLOSED_LOG))
+        self.assertTrue(is_dialog_closed(json.dumps({"endTime": 1720000000000})))
+        self.assertFalse(is_dialog_closed(OPEN_LOG))
+
+    def test_text(self):
+        self.assertTrue(is_dialog_closed("2024-07-01T12:00:04Z INFO call ended\n"))
+        self.assertFalse(is_dialog_closed("2024-07-01T12:00:04Z INFO state=Ask\n"))
+        self.assertFalse(is_dialog_closed(""))
+
+
+class TestInsightsClientLogCache(unittest.TestCase):
+
+    @patch("ocp.base.Authentication")
+    def setUp(self, MockAuthentication):
+        MockAuthentication.return_value.host = "http://fake-host.com"
+        MockAuthentication.return_value.get_token.return_value = "fake_token"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.client = InsightsClient(log_cache=DialogLogCache(self.tmp.name))
+
+    @patch("requests.get")
+    def test_closed_dialogs_are_cached(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200, text=CLOSED_LOG)
+
+        self.assertEqual(self.client.get_dialog_log("d1"), CLOSED_LOG)
+        self.assertEqual(self.client.get_dialog_logs(["d1", "d1"]), {"d1": CLOSED_LOG})
+        mock_get.assert_called_once()
+
+    @patch("requests.get")
+    def test_failed_logs_are_left_out(self, mock_get):
+        failed = MagicMock(status_code=500, text="Internal Server Error")
+        failed.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        mock_get.side_effect = lambda url, headers: (
+            failed if "/d2/" in url else MagicMock(status_code=200, text=CLOSED_LOG)
+        )
+
+        self.assertEqual(self.client.get_dialog_logs(["d1", "d2"]), {"d1": CLOSED_LOG})
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.get_dialog_log("d2")
+
+    @patch("ocp.base.Authentication")
+    def test_cache_can_be_disabled(self, MockAuthentication):
+        MockAuthentication.return_value.host = "http://fake-host.com"
+        with patch("ocp.insights.default_log_cache", return_value=self.client.log_cache):
+            self.assertIs(InsightsClient().log_cache, self.client.log_cache)
+            self.assertIsNone(InsightsClient(log_cache=False).log_cache)
+
+    @patch("requests.get")
+    def test_open_dialogs_are_not_cached(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200, text=OPEN_LOG)
+
+        self.client.get_dialog_log("d1")
+        self.client.get_dialog_log("d1")
+
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
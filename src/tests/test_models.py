@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp import models
+from ocp.models import Canvas, Dialog
+from ocp.orchestrator import OrchestratorClient
+
+
+CANVAS = {
+    "id": "c1",
+    "name": "Support",
+    "viewport": {"zoom": 1},
+    "nodes": [
+        {"id": "start", "type": "start", "data": {"label": "Start"}},
+        {"id": "menu", "type": "miniapp", "data": {"label": "Menu", "prompt": "Hi"}},
+    ],
+    "edges": [{"source": "start", "target": "menu", "sourceHandle": "next"}],
+}
+
+
+class TestModels(unittest.TestCase):
+
+    def test_canvas(self):
+        canvas = Canvas.from_bytes(json.dumps(CANVAS).encode())
+
+        self.assertEqual([n.id for n in canvas.nodes], ["start", "menu"])
+        self.assertEqual(canvas.nodes[1].name, "Menu")
+        self.assertEqual(canvas.nodes[1].data["data"]["prompt"], "Hi")
+        self.assertEqual(canvas.edges[0].id, "start:next->menu:")
+        self.assertEqual(canvas.data, {"id": "c1", "name": "Support", "viewport": {"zoom": 1}})
+        self.assertFalse(hasattr(canvas.nodes[0], "__dict__"))
+
+    def test_nested_graph(self):
+        canvas = Canvas.from_dict({"id": "c1", "canvas": {"nodes": CANVAS["nodes"], "zoom": 2}})
+
+        self.assertEqual(len(canvas.nodes), 2)
+        self.assertEqual(canvas.data, {"id": "c1", "canvas": {"zoom": 2}})
+
+    def test_digest_ignores_key_order(self):
+        first = Canvas.from_dict({"nodes": [{"id": "a", "type": "t", "data": {"x": 1, "y": 2}}]})
+        second = Canvas.from_dict({"nodes": [{"data": {"y": 2, "x": 1}, "type": "t", "id": "a"}]})
+
+        self.assertEqual(first.nodes[0].digest, second.nodes[0].digest)
+
+    def test_without_orjson(self):
+        with patch.object(models, "orjson", None):
+            dialog = Dialog.from_dict({"dialogId": "d1", "steps": 4, "duration": "slow"})
+
+            self.assertEqual(dialog.data, {"dialogId": "d1", "steps": 4, "duration": "slow"})
+        self.assertEqual((dialog.id, dialog.steps, dialog.duration_ms), ("d1", 4, None))
+
+
+class TestClientModels(unittest.TestCase):
+
+    @patch("requests.get")
+    @patch("ocp.base.Authentication")
+    def test_get_canvas_model(self, MockAuthentication, mock_get):
+        MockAuthentication.return_value.host = "http://fake-host.com"
+        MockAuthentication.return_value.get_token.return_value = "fake_token"
+        mock_get.return_value = MagicMock(status_code=200, content=json.dumps(CANVAS).encode())
+
+        canvas = OrchestratorClient().get_canvas_model("c1")
+
+        self.assertEqual(canvas.id, "c1")
+        mock_get.assert_called_once_with(
+            "http://fake-host.com/orchestrator/api/canvases/c1/",
+            headers={"Authorization": "Bearer fake_token"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import email.parser
+import gzip
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.miniapps import MiniAppsClient
+from ocp.multipart import iter_json, json_file_upload
+
+
+MODEL = {
+    "welcome": {"locales": {"en-US": {"omIVR": {"normal": "Hi é"}}}},
+    "states": [{"id": 1, "next": None}, [], {}, 2.5, True],
+    1: "numeric key",
+    "empty": {},
+}
+
+
+def parse(headers, body):
+    """Returns the name, filename and content of the single part of a form-data body."""
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body
+    )
+    part = message.get_payload()[0]
+    return part.get_param("name", header="content-disposition"), part.get_filename(), part.get_payload()
+
+
+class TestMultipart(unittest.TestCase):
+
+    def test_same_as_json_dumps(self):
+        for depth in range(4):
+            with self.subTest(depth=depth):
+                self.assertEqual("".join(iter_json(MODEL, depth)), json.dumps(MODEL))
+
+    def test_chunked_upload(self):
+        headers, body = json_file_upload("file", "app.json", MODEL, chunk_size=16)
+        chunks = list(body)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(parse(headers, b"".join(chunks)), ("file", "app.json", json.dumps(MODEL)))
+
+    def test_compressed_upload(self):
+        headers, body = json_file_upload("file", "app.json", MODEL, compress=True)
+
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(parse(headers, gzip.decompress(b"".join(body)))[2], json.dumps(MODEL))
+
+
+class TestUpdateMiniapp(unittest.TestCase):
+
+    @patch("requests.put")
+    @patch("ocp.base.Authentication")
+    def test_streams_the_model(self, MockAuthentication, mock_put):
+        MockAuthentication.return_value.host = "http://fake-host.com"
+        MockAuthentication.return_value.get_token.return_value = "fake_token"
+        sent = {}
+
+        def put(url, headers, data):
+            sent.update(url=url, headers=headers, body=b"".join(data))
+            return MagicMock(status_code=200, json=MagicMock(return_value={"ok": True}))
+
+        mock_put.side_effect = put
+
+        client = MiniAppsClient()
+        client.update_miniapp("app1", {"model": MODEL}, version="v1", compress=False)
+
+        self.assertEqual(sent["url"], "http://fake-host.com/miniapps/api/apps/v1/app1")
+        self.assertEqual(sent["headers"]["Authorization"], "Bearer fake_token")
+        self.assertEqual(parse(sent["headers"], sent["body"]), ("file", "app1.json", json.dumps(MODEL)))
+
+
+if __name__ == "__main__":
+    unittest.main()
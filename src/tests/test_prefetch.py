@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.prefetch import Prefetcher, canvas_references, prefetch_canvas_references
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.prefetcher = Prefetcher(max_workers=1, max_pending=2)
+        self.addCleanup(self.prefetcher._pool.shutdown)
+
+    def wait(self):
+        self.prefetcher._pool.submit(lambda: None).result()
+
+    def test_hits_and_misses(self):
+        fetch = MagicMock()
+        self.assertTrue(self.prefetcher.prefetch(("miniapp", "default", "a"), fetch, ttl=60))
+        self.wait()
+        # Already prefetched
+        self.assertFalse(self.prefetcher.prefetch(("miniapp", "default", "a"), fetch, ttl=60))
+
+        self.assertTrue(self.prefetcher.claim(("miniapp", "default", "a")))
+        self.assertFalse(self.prefetcher.claim(("miniapp", "default", "b")))
+
+        fetch.assert_called_once()
+        self.assertEqual(
+            self.prefetcher.stats(),
+            {
+                "miniapp": {
+                    "completed": 1,
+                    "hits": 1,
+                    "misses": 1,
+                    "started": 1,
+                    "hit_rate": 0.5,
+                    "used_rate": 1.0,
+                }
+            },
+        )
+
+    def test_bounded(self):
+        release = threading.Event()
+        for i in range(3):
+            self.prefetcher.prefetch(("log", "default", str(i)), release.wait, ttl=60)
+        release.set()
+        self.wait()
+
+        stats = self.prefetcher.stats()["log"]
+        self.assertEqual((stats["started"], stats["dropped"]), (2, 1))
+
+    def test_uncacheable_results_are_not_hits(self):
+        self.prefetcher.prefetch(("log", "default", "open"), lambda: False, ttl=60)
+        self.wait()
+
+        self.assertFalse(self.prefetcher.claim(("log", "default", "open")))
+        self.assertEqual(self.prefetcher.stats()["log"]["not_kept"], 1)
+
+
+class TestCanvasReferences(unittest.TestCase):
+
+    def test_references(self):
+        canvas = {
+            "nodes": [
+                {"id": "1", "data": {"miniappId": "m1", "settings": [{"collectionId": "c1"}]}},
+                {"id": "2", "data": {"miniapp_id": "m2"}},
+            ]
+        }
+
+        self.assertEqual(canvas_references(canvas), ({"m1", "m2"}, {"c1"}))
+
+    def test_nothing_to_keep_them_in(self):
+        prefetcher = MagicMock()
+        miniapps = MagicMock(cache=None)
+
+        prefetch_canvas_references(prefetcher, {"miniappId": "m1"}, "default", miniapps, MagicMock())
+
+        prefetcher.prefetch.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp import profiling
+from ocp.profiling import profiled
+
+
+@profiled
+def busy_tool(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return "done"
+
+
+@profiled
+async def async_tool():
+    await asyncio.sleep(0.02)
+    return [bytearray(1024) for _ in range(100)]
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(profiling.disable)
+
+    def test_disabled(self):
+        self.assertEqual(busy_tool(0), "done")
+
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_every_nth_call(self):
+        profiling.configure(tools=["busy_tool"], every=2, directory=self.tmp.name, interval=0.001)
+
+        for _ in range(4):
+            self.assertEqual(busy_tool(), "done")
+
+        files = sorted(os.listdir(self.tmp.name))
+        self.assertEqual(len(files), 2)
+        with open(os.path.join(self.tmp.name, files[0])) as f:
+            self.assertIn("busy_tool (test_profiling.py", f.read())
+        recent = profiling.status()["recent"][-2:]
+        self.assertEqual([r["tool"] for r in recent], ["busy_tool", "busy_tool"])
+
+    def test_async_with_memory(self):
+        profiling.configure(memory=True, directory=self.tmp.name)
+
+        self.assertEqual(len(asyncio.run(async_tool())), 100)
+
+        extensions = sorted(os.path.splitext(f)[1] for f in os.listdir(self.tmp.name))
+        self.assertEqual(extensions, [".collapsed", ".tracemalloc", ".txt"])
+
+    def test_other_tools_are_not_profiled(self):
+        profiling.configure(tools=["busy_tool"], directory=self.tmp.name)
+
+        asyncio.run(async_tool())
+
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
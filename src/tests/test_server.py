@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+
+import anyio
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+import server
+from server import Backpressure
+
+
+class TestBackpressure(unittest.TestCase):
+    def test_rejects_beyond_the_queue(self):
+        release = anyio.Event()
+        statuses = []
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await PlainTextResponse("done")(scope, receive, send)
+
+        middleware = Backpressure(slow_app, max_concurrent=1, max_queued=1, queue_timeout=5)
+
+        async def request(path="/mcp/"):
+            scope = {"type": "http", "method": "POST", "path": path, "headers": []}
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append((path, message["status"]))
+
+            await middleware(scope, receive, send)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(request)
+                tg.start_soon(request)
+                await anyio.sleep(0.05)
+                self.assertEqual((middleware.active, middleware.queued), (1, 1))
+                self.assertTrue(middleware.saturated)
+                # A third request is turned away at once, health checks are not
+                await request()
+                await request("/health")
+                release.set()
+
+        anyio.run(main)
+        self.assertEqual(
+            statuses, [("/mcp/", 503), ("/health", 200), ("/mcp/", 200), ("/mcp/", 200)]
+        )
+        self.assertEqual(middleware.rejected, 1)
+
+    def test_queue_timeout(self):
+        async def stuck_app(scope, receive, send):
+            await anyio.sleep_forever()
+
+        middleware = Backpressure(stuck_app, max_concurrent=1, max_queued=1, queue_timeout=0.05)
+        client = TestClient(middleware)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(middleware, {"type": "http", "path": "/mcp/"}, None, None)
+                await anyio.sleep(0.01)
+                response = await anyio.to_thread.run_sync(lambda: client.post("/mcp/"))
+                tg.cancel_scope.cancel()
+            return response
+
+        response = anyio.run(main)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+
+class TestRoutes(unittest.TestCase):
+    def test_health_and_readiness(self):
+        app = server.create_app()
+        client = TestClient(app)
+
+        self.assertEqual(client.get("/health").status_code, 200)
+        # Not ready before the worker has started
+        self.assertEqual(client.get("/ready").status_code, 503)
+        with TestClient(app) as started:
+            response = started.get("/ready")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["active"], 0)
+        self.assertEqual(client.get("/ready").status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
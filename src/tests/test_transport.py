@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+import requests
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp import transport
+
+
+class TestTransport(unittest.TestCase):
+
+    def use_client(self, client):
+        patcher = patch.object(transport, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("requests.get")
+    def test_http1_by_default(self, mock_get):
+        self.use_client(None)
+        with patch.dict(os.environ, {"OCP_HTTP2": ""}):
+            transport.get("http://fake-host.com/apps", params={"a": 1})
+
+        mock_get.assert_called_once_with("http://fake-host.com/apps", params={"a": 1})
+
+    def test_http2(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            if request.url.path == "/missing":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"ok": True})
+
+        self.use_client(httpx.Client(transport=httpx.MockTransport(handler)))
+
+        response = transport.get("http://fake-host.com/apps", params={"a": 1, "b": None})
+        transport.put("http://fake-host.com/apps/1", data=iter([b"{", b"}"]))
+
+        self.assertEqual(response.json(), {"ok": True})
+        self.assertEqual(str(seen[0].url), "http://fake-host.com/apps?a=1")
+        self.assertEqual(seen[1].read(), b"{}")
+        with self.assertRaises(requests.exceptions.HTTPError):
+            transport.get("http://fake-host.com/missing").raise_for_status()
+
+    def test_connection_errors(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        self.use_client(httpx.Client(transport=httpx.MockTransport(handler)))
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.get("http://fake-host.com/apps")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp.variables_sync import diff_collections, export_collections, sync_collections, value_hash
+
+
+def fake_client(collections: dict):
+    """A client serving collections given as {name: (id, [variables])}."""
+    client = MagicMock()
+    client.get_variable_collections.return_value = {
+        "items": [{"id": i, "name": name} for name, (i, _) in collections.items()]
+    }
+    by_id = {i: variables for i, variables in collections.values()}
+    client.get_collection_variables.side_effect = lambda i: {"variables": by_id[i]}
+    return client
+
+
+STAGING = {
+    "prompts": ("s1", [
+        {"id": "v1", "key": "greeting", "value": "Hello!", "updatedAt": "2024-07-02"},
+        {"id": "v2", "key": "timeout", "value": 30},
+        {"id": "v3", "key": "queue", "value": "new"},
+    ]),
+    "routing": ("s2", [{"key": "fallback", "value": "+1"}]),
+    "staging_only": ("s3", []),
+}
+PRODUCTION = {
+    "prompts": ("p1", [
+        {"id": "x1", "key": "greeting", "value": "Hello!", "updatedAt": "2024-01-01"},
+        {"id": "x2", "key": "timeout", "value": 10},
+        {"id": "x4", "key": "legacy", "value": True},
+    ]),
+    "routing": ("p2", [{"key": "fallback", "value": "+1"}]),
+}
+
+
+class TestVariablesSync(unittest.TestCase):
+    def test_value_hash_ignores_metadata(self):
+        self.assertEqual(
+            value_hash({"id": "a", "key": "k", "value": [1, 2], "updatedAt": "x"}),
+            value_hash({"value": [1, 2], "key": "k", "id": "b"}),
+        )
+        self.assertNotEqual(value_hash({"key": "k", "value": 1}), value_hash({"key": "k", "value": "1"}))
+
+    def test_export_reads_selected_collections(self):
+        client = fake_client(STAGING)
+
+        exported = export_collections(client, names=["prompts", "missing"])
+
+        self.assertEqual(list(exported), ["prompts"])
+        self.assertEqual(exported["prompts"]["id"], "s1")
+        self.assertEqual(list(exported["prompts"]["variables"]), ["greeting", "timeout", "queue"])
+
+    def test_diff(self):
+        diff = diff_collections(
+            export_collections(fake_client(STAGING)), export_collections(fake_client(PRODUCTION))
+        )
+
+        self.assertEqual(diff["only_in_source"], ["staging_only"])
+        self.assertEqual(diff["only_in_target"], [])
+        self.assertEqual(
+            diff["collections"],
+            {
+                "prompts": {
+                    "source_id": "s1",
+                    "target_id": "p1",
+                    "added": ["queue"],
+                    "changed": ["timeout"],
+                    "removed": ["legacy"],
+                    "unchanged": 1,
+                }
+            },
+        )
+
+    def test_dry_run_writes_nothing(self):
+        target = fake_client(PRODUCTION)
+
+        report = sync_collections(fake_client(STAGING), target)
+
+        self.assertTrue(report["dry_run"])
+        self.assertEqual(report["collections"]["prompts"]["batches"], 1)
+        self.assertEqual(report["collections"]["prompts"]["written"], 0)
+        target.update_collection_variables.assert_not_called()
+
+    def test_sync_writes_changed_variables_in_batches(self):
+        target = fake_client(PRODUCTION)
+
+        report = sync_collections(fake_client(STAGING), target, dry_run=False, batch_size=1)
+
+        self.assertEqual(report["collections"]["prompts"]["written"], 2)
+        self.assertEqual(report["collections"]["prompts"]["batches"], 2)
+        writes = sorted(
+            (c.args[0], c.args[1][0]["key"], c.args[1][0]["value"])
+            for c in target.update_collection_variables.call_args_list
+        )
+        self.assertEqual(writes, [("p1", "queue", "new"), ("p1", "timeout", 30)])
+        # Record metadata of the source environment is not copied
+        for c in target.update_collection_variables.call_args_list:
+            self.assertNotIn("id", c.args[1][0])
+
+    def test_failed_batches_are_reported(self):
+        target = fake_client(PRODUCTION)
+        target.update_collection_variables.side_effect = Exception("403 Forbidden")
+
+        report = sync_collections(fake_client(STAGING), target, dry_run=False)
+
+        self.assertEqual(report["collections"]["prompts"]["written"], 0)
+        self.assertEqual(report["collections"]["prompts"]["errors"], ["403 Forbidden"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from ocp import watcher as watcher_module
+from ocp.base import BaseClient
+from ocp.environments import Environment
+from ocp.watcher import Watcher
+
+
+def page(*apps):
+    return json.dumps({"items": [{"id": i, "name": n} for i, n in apps]}).encode()
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.get_active_version.return_value = "v1"
+        patchers = [
+            patch.object(watcher_module, "get_client", return_value=self.client),
+            patch.object(
+                watcher_module, "get_environment", return_value=Environment("default", "host")
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.watcher = Watcher(kinds=["miniapps"])
+
+    def test_reports_changes_since_the_first_poll(self):
+        self.client.get_conditional.side_effect = [
+            (page(("a", "A"), ("b", "B")), '"1"'),
+            (None, '"1"'),
+            (page(("a", "A"), ("b", "B")), None),
+            (page(("a", "A2"), ("c", "C")), '"2"'),
+        ]
+        received = []
+        self.watcher.subscribe(received.append)
+
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(self.watcher.poll(), [])
+        events = self.watcher.poll()
+
+        self.assertEqual(
+            [(e.seq, e.change, e.id) for e in events],
+            [(1, "modified", "a"), (2, "added", "c"), (3, "removed", "b")],
+        )
+        self.assertEqual(received, [events])
+        self.assertEqual(self.watcher.events(since=2), events[2:])
+        self.assertEqual(self.client.get_conditional.call_args_list[1].kwargs["etag"], '"1"')
+        # Only the changed miniapps are dropped from the response cache
+        self.client._invalidate.assert_any_call("miniapps/api/apps/v1/a")
+        self.assertEqual(self.client._invalidate.call_count, 3)
+
+    def test_subscriber_errors_are_contained(self):
+        self.client.get_conditional.side_effect = [(page(), None), (page(("a", "A")), None)]
+        self.watcher.subscribe(MagicMock(side_effect=RuntimeError("boom")))
+        self.watcher.poll()
+
+        self.assertEqual(len(self.watcher.poll()), 1)
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    @patch("requests.get")
+    @patch("ocp.base.Authentication")
+    def test_not_modified(self, MockAuthentication, mock_get):
+        MockAuthentication.return_value.host = "http://fake-host.com"
+        MockAuthentication.return_value.get_token.return_value = "fake_token"
+        mock_get.return_value = MagicMock(status_code=304)
+
+        content, etag = BaseClient().get_conditional("apps", etag='"1"')
+
+        self.assertEqual((content, etag), (None, '"1"'))
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"1"')
+
+
+if __name__ == "__main__":
+    unittest.main()